@@ -5,11 +5,14 @@ from typing import List
 from app.db.database import get_db
 from app.models.document import Document, Analysis, Conversation, Message
 from app.schemas.document import AnalysisResponse, MessageCreate, MessageResponse, ConversationResponse
-from app.services.ai_service import AIService
+from app.services.analysis_runner import ai_service, run_analysis
+from app.services.answer_cache import AnswerCache
+from app.core.config import settings
+from app.core.metrics import add_background_task
+from app.core.profiling import ProfilingRoute
 import json
 
-router = APIRouter()
-ai_service = AIService()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 @router.post("/documents/{document_id}/analyze", response_model=AnalysisResponse)
@@ -36,34 +39,11 @@ def analyze_document(document_id: int, background_tasks: BackgroundTasks, db: Se
     db.refresh(analysis)
     
     # Run analysis in background
-    background_tasks.add_task(run_analysis, document.content, analysis.id, db)
+    add_background_task(background_tasks, run_analysis, document.content, analysis.id, db)
     
     return analysis
 
 
-def run_analysis(document_text: str, analysis_id: int, db: Session):
-    """Background task to run document analysis"""
-    # Get the analysis record
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
-    if not analysis:
-        print(f"Analysis {analysis_id} not found")
-        return
-    
-    try:
-        # Run AI analysis
-        result = ai_service.analyze_document(document_text)
-        
-        # Update the analysis record
-        analysis.summary = result["summary"]
-        analysis.key_topics = result["key_topics"]
-        db.commit()
-    except Exception as e:
-        # Update with error
-        analysis.summary = f"Analysis failed: {str(e)}"
-        db.commit()
-        print(f"Analysis error: {e}")
-
-
 @router.post("/documents/{document_id}/conversations", response_model=ConversationResponse)
 def create_conversation(document_id: int, db: Session = Depends(get_db)):
     """Create a new conversation for a document"""
@@ -103,15 +83,22 @@ def create_message(message: MessageCreate, db: Session = Depends(get_db)):
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Generate AI response
+    # Generate AI response, reusing the answer to an earlier rephrasing of the question if there is one
     try:
-        ai_response = ai_service.answer_question(message.content, document.content)
+        answer_cache = AnswerCache(db) if settings.ANSWER_CACHE_ENABLED else None
+        ai_response = answer_cache.lookup(document, message.content) if answer_cache else None
+        from_cache = ai_response is not None
+        if not from_cache:
+            ai_response = ai_service.answer_question(message.content, document.content)
+            if answer_cache:
+                answer_cache.store(document, message.content, ai_response)
         
         # Save AI response
         ai_message = Message(
             conversation_id=message.conversation_id,
             content=ai_response,
-            is_user=0
+            is_user=0,
+            from_cache=from_cache
         )
         db.add(ai_message)
         db.commit()
@@ -120,6 +107,7 @@ def create_message(message: MessageCreate, db: Session = Depends(get_db)):
         return ai_message
     except Exception as e:
         # Return error message
+        db.rollback()
         error_message = Message(
             conversation_id=message.conversation_id,
             content=f"Error generating response: {str(e)}",
@@ -195,6 +183,7 @@ def get_analyses_history(db: Session = Depends(get_db)):
                     "document_id": analysis.document_id,
                     "summary": analysis.summary,
                     "key_topics": analysis.key_topics,
+                    "strategy": analysis.strategy,
                     "created_at": analysis.created_at
                 },
                 "document": {
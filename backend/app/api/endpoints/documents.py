@@ -1,17 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List
 
+from app.core.config import settings
+from app.core.metrics import add_background_task
+from app.core.profiling import ProfilingRoute
 from app.db.database import get_db
-from app.models.document import Document
-from app.schemas.document import DocumentResponse, DocumentDetail
+from app.models.document import Document, IngestionBatch, IngestionItem, AnswerCacheEntry
+from app.schemas.document import DocumentResponse, DocumentDetail, IngestionBatchResponse, NearDuplicateResponse
 from app.services.document_processor import DocumentProcessor
+from app.services.bulk_ingestion import BulkIngestionService
+from app.services.keyphrase_extractor import KeyphraseExtractor
+from app.services.near_duplicate import NearDuplicateIndex
 from app.services.analysis_runner import run_analysis
  # Import the analysis function
 from app.models.document import Analysis  # Import the Analysis model
 from fastapi import Body
+import json
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 @router.post("/upload", response_model=DocumentResponse)
@@ -32,35 +40,73 @@ async def upload_document(
     # Save file
     file_path = await DocumentProcessor.save_upload_file(file)
     
+    # Extraction, MinHash signing and keyphrasing are CPU bound, keep them off the event loop
+    db_document, analysis = await run_in_threadpool(
+        _create_document, db, file.filename, file_path, file_extension
+    )
+    
+    # Run analysis in background
+    add_background_task(background_tasks, run_analysis, db_document.content, analysis.id, db)
+    
+    return db_document
+
+
+def _create_document(db: Session, filename: str, file_path: str, file_extension: str):
+    """Extract an uploaded file and record it with its placeholder analysis"""
     # Extract text
     text_content = DocumentProcessor.extract_text(file_path)
     
     # Create document record
     db_document = Document(
-        filename=file.filename,
+        filename=filename,
         file_path=file_path,
         file_type=file_extension,
         content=text_content
     )
-    
     db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
+    db.flush()
+    NearDuplicateIndex.index_document(db, db_document)
+    
+    # Local key topics are available immediately; the LLM can refine them later
+    key_topics = []
+    if settings.LOCAL_TOPICS_ENABLED:
+        key_topics = KeyphraseExtractor.index_document(db, db_document, settings.AI_MAX_TOPICS)
     
     # Automatically start analysis in background
     analysis = Analysis(
         document_id=db_document.id,
         summary="Analysis in progress...",
-        key_topics="[]"
+        key_topics=json.dumps(key_topics)
     )
     db.add(analysis)
     db.commit()
+    db.refresh(db_document)
     db.refresh(analysis)
+    return db_document, analysis
+
+
+@router.post("/bulk-upload", response_model=IngestionBatchResponse)
+async def bulk_upload_documents(
+    files: List[UploadFile] = File(...),
+    background_tasks: BackgroundTasks = None,
+    db: Session = Depends(get_db)
+):
+    """Upload many document files and/or ZIP archives of them in one request"""
+    # Files are written to disk here; extraction and analysis continue in the background
+    batch = await BulkIngestionService.receive_files(files, db)
     
-    # Run analysis in background
-    background_tasks.add_task(run_analysis, db_document.content, analysis.id, db)
+    add_background_task(background_tasks, BulkIngestionService.process_batch, batch.id)
     
-    return db_document
+    return batch
+
+
+@router.get("/batches/{batch_id}", response_model=IngestionBatchResponse)
+def get_ingestion_batch(batch_id: int, db: Session = Depends(get_db)):
+    """Get the status of a bulk upload batch with per-file status"""
+    batch = db.query(IngestionBatch).filter(IngestionBatch.id == batch_id).first()
+    if not batch:
+        raise HTTPException(status_code=404, detail="Ingestion batch not found")
+    return batch
 
 
 @router.get("/", response_model=List[DocumentResponse])
@@ -78,6 +124,22 @@ def get_document(document_id: int, db: Session = Depends(get_db)):
     return document
 
 
+@router.get("/{document_id}/near-duplicates", response_model=List[NearDuplicateResponse])
+def get_near_duplicates(document_id: int, threshold: float = None, limit: int = 10, db: Session = Depends(get_db)):
+    """Find documents that are near-duplicates (e.g. revised copies) of a document"""
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    matches = NearDuplicateIndex.find_near_duplicates(
+        db, document, threshold if threshold is not None else settings.NEAR_DUPLICATE_THRESHOLD, limit
+    )
+    return [
+        {"id": match.id, "filename": match.filename, "similarity": round(similarity, 3)}
+        for match, similarity in matches
+    ]
+
+
 @router.delete("/{document_id}")
 def delete_document(document_id: int, db: Session = Depends(get_db)):
     """Delete a document"""
@@ -95,6 +157,14 @@ def delete_document(document_id: int, db: Session = Depends(get_db)):
         print(f"Error deleting file: {e}")
     
     # Delete from database
+    NearDuplicateIndex.remove_document(db, document.id)
+    db.query(AnswerCacheEntry).filter(AnswerCacheEntry.document_id == document.id).delete()
+    # Bulk upload items keep their status and error, only the link to the document goes
+    db.query(IngestionItem).filter(IngestionItem.document_id == document.id).update(
+        {"document_id": None}, synchronize_session=False
+    )
+    # Only takes out the term counts this document contributed
+    KeyphraseExtractor.remove_document(db, document)
     db.delete(document)
     db.commit()
     
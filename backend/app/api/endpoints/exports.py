@@ -0,0 +1,155 @@
+import json
+import zlib
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.api.endpoints.auth import get_current_user
+from app.core.config import settings
+from app.core.profiling import ProfilingRoute
+from app.db.database import SessionLocal
+from app.models.document import Document, Analysis, Conversation
+
+# Exports hand out the whole corpus, so unlike the per-document endpoints they need a signed-in user
+router = APIRouter(route_class=ProfilingRoute, dependencies=[Depends(get_current_user)])
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _json_list(value: Optional[str]) -> list:
+    try:
+        return json.loads(value or "[]")
+    except ValueError:
+        return []
+
+
+def _document_row(document: Document, include_content: bool) -> dict:
+    row = {
+        "id": document.id,
+        "filename": document.filename,
+        "file_type": document.file_type,
+        "upload_date": _isoformat(document.upload_date),
+        "tags": _json_list(document.tags),
+    }
+    if include_content:
+        row["content"] = document.content
+    return row
+
+
+def _analysis_row(analysis: Analysis) -> dict:
+    return {
+        "id": analysis.id,
+        "document_id": analysis.document_id,
+        "summary": analysis.summary,
+        "key_topics": _json_list(analysis.key_topics),
+        "strategy": analysis.strategy,
+        "created_at": _isoformat(analysis.created_at),
+    }
+
+
+def _conversation_row(conversation: Conversation) -> dict:
+    return {
+        "id": conversation.id,
+        "document_id": conversation.document_id,
+        "created_at": _isoformat(conversation.created_at),
+        "messages": [
+            {
+                "id": message.id,
+                "content": message.content,
+                "role": "user" if message.is_user else "assistant",
+                "from_cache": bool(message.from_cache),
+                "created_at": _isoformat(message.created_at),
+            }
+            for message in sorted(conversation.messages, key=lambda message: message.id)
+        ],
+    }
+
+
+def _stream_jsonl(statement, to_row: Callable, compress: bool) -> Iterator[bytes]:
+    """Write query results as JSONL, one batch of rows at a time.
+
+    Runs in its own session because the response body is produced after the endpoint
+    has returned. Rows come from a server-side cursor, so memory stays bounded by one batch.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 writes a gzip stream
+    db = SessionLocal()
+    try:
+        result = db.scalars(statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        for batch in result.partitions():
+            chunk = "".join(json.dumps(to_row(row), default=str) + "\n" for row in batch).encode("utf-8")
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            # The identity map holds rows weakly, so each batch is freed once written
+            if chunk:
+                yield chunk
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+
+def _filtered(model, date_column, since: Optional[datetime], until: Optional[datetime], after_id: int):
+    # Ordered by id so an interrupted export resumes with after_id set to the last id received
+    statement = select(model).where(model.id > after_id).order_by(model.id)
+    if since:
+        statement = statement.where(date_column >= since)
+    if until:
+        statement = statement.where(date_column < until)
+    return statement
+
+
+def _export_response(name: str, statement, to_row: Callable, compress: bool) -> StreamingResponse:
+    filename = f"{name}.jsonl.gz" if compress else f"{name}.jsonl"
+    return StreamingResponse(
+        _stream_jsonl(statement, to_row, compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/documents")
+def export_documents(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after_id: int = 0,
+    include_content: bool = True,
+    compress: bool = False
+):
+    """Export documents uploaded in [since, until) with an id above after_id as JSONL"""
+    statement = _filtered(Document, Document.upload_date, since, until, after_id)
+    return _export_response(
+        "documents", statement, lambda document: _document_row(document, include_content), compress
+    )
+
+
+@router.get("/analyses")
+def export_analyses(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after_id: int = 0,
+    compress: bool = False
+):
+    """Export analyses created in [since, until) with an id above after_id as JSONL"""
+    statement = _filtered(Analysis, Analysis.created_at, since, until, after_id)
+    return _export_response("analyses", statement, _analysis_row, compress)
+
+
+@router.get("/conversations")
+def export_conversations(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after_id: int = 0,
+    compress: bool = False
+):
+    """Export conversations started in [since, until) with an id above after_id, with their messages, as JSONL"""
+    # Messages are loaded with one extra query per batch of conversations
+    statement = _filtered(Conversation, Conversation.created_at, since, until, after_id).options(
+        selectinload(Conversation.messages)
+    )
+    return _export_response("conversations", statement, _conversation_row, compress)
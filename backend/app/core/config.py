@@ -1,3 +1,4 @@
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -14,10 +15,20 @@ class Settings(BaseSettings):
     # Security settings
     SECRET_KEY: str = "your-secret-key-here"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    PASSWORD_HASH_WORKERS: int = 4  # Threads for bcrypt, bounds CPU spent on logins at once
+    AUTH_CACHE_TTL_SECONDS: int = 60  # How long a verified token skips the user lookup, 0 disables
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
 
     # File storage settings
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10 MB
+    EXPORT_BATCH_SIZE: int = 500  # Rows fetched per round trip when streaming exports
+
+    # Bulk ingestion settings
+    MAX_BULK_FILES: int = 10000  # Files accepted per batch, ZIP entries included
+    BULK_EXTRACT_WORKERS: int = 4  # Processes used for parallel text extraction
+    BULK_INSERT_BATCH_SIZE: int = 100  # Documents inserted per transaction
+    BULK_ANALYSIS_CONCURRENCY: int = 2  # Analyses running at once per batch
 
     # LLM settings
     GOOGLE_API_KEY: str 
@@ -25,6 +36,53 @@ class Settings(BaseSettings):
     LANGSMITH_PROJECT: str = "ai-document-analysis"
     LANGSMITH_TRACING: bool = True
     LANGSMITH_ENDPOINT: str = "https://api.smith.langchain.com"
+    AI_MAX_CONCURRENCY: int = 4  # Parallel LLM calls within one map step
+    AI_MAX_TOPICS: int = 7  # Key topics kept per document
+    LOCAL_TOPICS_ENABLED: bool = True  # Extract key topics locally at upload
+    LLM_TOPICS_ENABLED: bool = True  # Replace local topics with LLM topics once analysis finishes
+
+    # Model routing per pipeline stage (map, reduce, stuff, qa); dicts are set as JSON in the environment
+    AI_MODEL: str = "gemini-2.0-flash"  # Used by stages without an entry in AI_STAGE_MODELS
+    AI_STAGE_MODELS: Dict[str, str] = {"map": "gemini-2.0-flash-lite"}
+    AI_FALLBACK_MODEL: str = "gemini-2.0-flash"  # Retried when a stage's model errors or times out
+    # Seconds per request; the client retries a failed request once, so a stage can take about twice as long
+    AI_STAGE_TIMEOUTS: Dict[str, float] = {"map": 30, "reduce": 60, "stuff": 120, "qa": 60}
+    # USD per million tokens as [input, output], used to report cost per stage
+    AI_MODEL_PRICES: Dict[str, List[float]] = {
+        "gemini-2.0-flash": [0.10, 0.40],
+        "gemini-2.0-flash-lite": [0.075, 0.30],
+    }
+
+    # Summarization strategy thresholds (estimated tokens)
+    AI_STUFF_MAX_TOKENS: int = 8000  # Up to this size a document is analyzed in one call
+    AI_MAP_REDUCE_MAX_TOKENS: int = 100000  # Above this, use large chunks and hierarchical reduction
+    AI_COLLAPSE_MAX_TOKENS: int = 8000  # Largest set of partial summaries merged in one reduce call
+    AI_CHUNK_SIZE: int = 2000  # Characters per chunk for map-reduce
+    AI_LARGE_CHUNK_SIZE: int = 8000  # Characters per chunk for hierarchical reduction
+
+    # Near-duplicate detection
+    NEAR_DUPLICATE_THRESHOLD: float = 0.8  # Estimated Jaccard similarity that counts as a revision
+    CHUNK_SUMMARY_CACHE_MAX_ENTRIES: int = 100000  # Map results kept for revisions, least recently used are evicted
+    
+    # Per-document answer cache for chat questions
+    ANSWER_CACHE_ENABLED: bool = True
+    # Cosine similarity for a question to reuse an answer with the default hashing embedder, which
+    # only matches near-identical wording; install sentence-transformers to match paraphrases
+    ANSWER_CACHE_SIMILARITY: float = 0.85
+    # sentence-transformers model for question similarity, used when the package is installed
+    ANSWER_CACHE_EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    ANSWER_CACHE_MODEL_SIMILARITY: float = 0.7  # Cosine similarity threshold with that model
+    ANSWER_CACHE_MAX_ENTRIES: int = 200  # Per document, least recently used entries are evicted
+    
+    # Local extractive pre-compression before LLM calls, switchable per operation
+    COMPRESS_ANALYSIS: bool = False
+    COMPRESS_QA: bool = False
+    COMPRESSION_RATIO: float = 0.5  # Fraction of the text kept
+    COMPRESSION_MIN_TOKENS: int = 8000  # Shorter documents are sent unchanged
+    
+    # Profiling (requests sending "X-Profile: 1" are profiled when enabled)
+    PROFILING_ENABLED: bool = False
+    PROFILE_DIR: str = "./profiles"
 
     class Config:
         env_file = ".env"
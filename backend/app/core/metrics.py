@@ -0,0 +1,152 @@
+import functools
+import os
+import time
+
+from fastapi import BackgroundTasks, Request
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.config import settings
+
+# Request latency per route template, e.g. /api/documents/{document_id}
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+)
+
+EXTRACTION_SECONDS = Histogram(
+    "document_extraction_seconds", "Text extraction time per file", ["file_type"]
+)
+EXTRACTION_BYTES = Counter(
+    "document_extraction_bytes_total", "Bytes of files passed to text extraction", ["file_type"]
+)
+EXTRACTION_ERRORS = Counter(
+    "document_extraction_errors_total", "Failed text extractions", ["file_type"]
+)
+
+# Stage is the pipeline step making the call: map, reduce, stuff or qa
+LLM_LATENCY = Histogram(
+    "llm_call_duration_seconds", "LLM call latency", ["stage"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "LLM tokens by direction (input/output)", ["stage", "direction"]
+)
+LLM_ERRORS = Counter("llm_errors_total", "Failed LLM calls", ["stage"])
+LLM_COST = Counter("llm_cost_usd_total", "Estimated LLM cost from AI_MODEL_PRICES", ["stage", "model"])
+LLM_FALLBACKS = Counter(
+    "llm_fallbacks_total", "Calls retried on the fallback model, by the model that failed", ["stage", "model"]
+)
+
+BACKGROUND_QUEUE_DEPTH = Gauge(
+    "background_tasks_queued", "Background tasks waiting to start", ["task"]
+)
+# The pool is saturated when checked out connections reach its size (pool_size + max_overflow)
+DB_CONNECTIONS_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out", "Pooled database connections currently in use"
+)
+DB_CONNECTION_HOLD_SECONDS = Histogram(
+    "db_connection_hold_seconds", "Time a database connection stays checked out of the pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by result (hit/miss)", ["cache", "result"])
+
+
+def record_cache(cache: str, hits: int, misses: int):
+    if hits:
+        CACHE_REQUESTS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, "miss").inc(misses)
+
+
+def observe_extraction(file_path: str, seconds: float, failed: bool):
+    file_type = os.path.splitext(file_path)[1].lower().lstrip(".") or "unknown"
+    EXTRACTION_SECONDS.labels(file_type).observe(seconds)
+    if os.path.exists(file_path):
+        EXTRACTION_BYTES.labels(file_type).inc(os.path.getsize(file_path))
+    if failed:
+        EXTRACTION_ERRORS.labels(file_type).inc()
+
+
+def track_extraction(func):
+    """Decorator for extractors taking the file path as first argument"""
+    @functools.wraps(func)
+    def wrapper(file_path: str, *args, **kwargs):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = func(file_path, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            observe_extraction(file_path, time.perf_counter() - started, failed)
+    return wrapper
+
+
+def llm_usage(prompt: str, response):
+    """Input and output tokens of a call: the provider's usage numbers, or an estimate"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return (
+        usage.get("input_tokens") or len(prompt) // 4,
+        usage.get("output_tokens") or len(response.content) // 4,
+    )
+
+
+def record_llm_cost(stage: str, model: str, input_tokens: int, output_tokens: int):
+    prices = settings.AI_MODEL_PRICES.get(model)
+    if prices:
+        LLM_COST.labels(stage, model).inc((input_tokens * prices[0] + output_tokens * prices[1]) / 1e6)
+
+
+def track_llm_call(func):
+    """Decorator for methods called as (self, prompt, stage) that return a chat message"""
+    @functools.wraps(func)
+    def wrapper(self, prompt: str, stage: str, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = func(self, prompt, stage, *args, **kwargs)
+        except Exception:
+            LLM_ERRORS.labels(stage).inc()
+            raise
+        finally:
+            LLM_LATENCY.labels(stage).observe(time.perf_counter() - started)
+
+        input_tokens, output_tokens = llm_usage(prompt, response)
+        LLM_TOKENS.labels(stage, "input").inc(input_tokens)
+        LLM_TOKENS.labels(stage, "output").inc(output_tokens)
+        return response
+    return wrapper
+
+
+def add_background_task(background_tasks: BackgroundTasks, func, *args, **kwargs):
+    """Add a background task, counting it in the queue depth gauge until it starts running"""
+    queue_depth = BACKGROUND_QUEUE_DEPTH.labels(func.__name__)
+    queue_depth.inc()
+
+    # Kept synchronous so Starlette still runs it in the threadpool
+    def run():
+        queue_depth.dec()
+        return func(*args, **kwargs)
+
+    background_tasks.add_task(run)
+
+
+def _route_template(request: Request) -> str:
+    # Put the parameter names back into the path, e.g. /api/documents/{document_id},
+    # so concrete ids never become label values
+    if request.scope.get("route") is None:
+        return "unmatched"
+    names = {str(value): f"{{{name}}}" for name, value in request.path_params.items()}
+    return "/".join(names.get(segment, segment) for segment in request.url.path.split("/"))
+
+
+async def metrics_middleware(request: Request, call_next):
+    """Record request latency per route template rather than per concrete URL"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUEST_LATENCY.labels(
+            request.method, _route_template(request), str(status)
+        ).observe(time.perf_counter() - started)
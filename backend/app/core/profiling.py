@@ -0,0 +1,104 @@
+import asyncio
+import cProfile
+import functools
+import os
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # Optional dependency, fall back to cProfile
+    Profiler = None
+
+PROFILE_HEADER = "X-Profile"
+
+# Output path for the current request's profile, set only when profiling was requested
+_profile_path: ContextVar[Optional[str]] = ContextVar("profile_path", default=None)
+
+
+async def profiling_middleware(request: Request, call_next):
+    """Profile a request when PROFILING_ENABLED is set and the request carries `X-Profile: 1`"""
+    if not settings.PROFILING_ENABLED or request.headers.get(PROFILE_HEADER) != "1":
+        return await call_next(request)
+
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    route = re.sub(r"[^\w]+", "_", request.url.path).strip("_") or "root"
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{route}-{uuid.uuid4().hex[:6]}"
+    path = os.path.join(settings.PROFILE_DIR, name + (".html" if Profiler else ".prof"))
+
+    token = _profile_path.set(path)
+    try:
+        response = await call_next(request)
+    finally:
+        _profile_path.reset(token)
+
+    if os.path.exists(path):
+        response.headers["X-Profile-File"] = path
+    return response
+
+
+class ProfilingRoute(APIRoute):
+    """Route class whose endpoints are profiled when profiling_middleware asked for it.
+
+    Profiling happens around the endpoint itself, so plain `def` endpoints are profiled in
+    the threadpool thread that actually runs them.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+
+def _start(async_mode: bool):
+    if Profiler is not None:
+        profiler = Profiler(async_mode="enabled" if async_mode else "disabled")
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+
+def _stop(profiler, path: str):
+    if Profiler is not None:
+        profiler.stop()
+        with open(path, "w") as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+def _profiled(endpoint):
+    # functools.wraps keeps the signature FastAPI inspects for parameters and dependencies
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            path = _profile_path.get()
+            if path is None:
+                return await endpoint(*args, **kwargs)
+            profiler = _start(async_mode=True)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _stop(profiler, path)
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        path = _profile_path.get()
+        if path is None:
+            return endpoint(*args, **kwargs)
+        profiler = _start(async_mode=False)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _stop(profiler, path)
+    return wrapper
@@ -0,0 +1,46 @@
+from sqlalchemy import inspect, literal
+from sqlalchemy.engine import Engine
+
+from app.db.database import Base
+
+# Columns added to tables that already existed in deployed databases. create_all() only
+# creates missing tables, so these are added by upgrade_schema(). Tables added after
+# the first release don't belong here.
+ADDED_COLUMNS = [
+    ("documents", "minhash"),
+    ("analyses", "strategy"),
+    ("messages", "from_cache"),
+    ("documents", "terms_indexed"),
+]
+
+
+def upgrade_schema(engine: Engine):
+    """Create missing tables and add missing columns to existing ones; safe to run on every start"""
+    # Make sure every model is registered on Base before creating tables
+    import app.models.document  # noqa: F401
+    import app.models.user  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table_name, column_name in ADDED_COLUMNS:
+            existing = {column["name"] for column in inspector.get_columns(table_name)}
+            if column_name in existing:
+                continue
+            column = Base.metadata.tables[table_name].columns[column_name]
+            connection.exec_driver_sql(_add_column_sql(engine, table_name, column))
+            print(f"Added column {table_name}.{column_name}")
+
+
+def _add_column_sql(engine: Engine, table_name: str, column) -> str:
+    dialect = engine.dialect
+    column_type = column.type.compile(dialect=dialect)
+    # SQLite has no ADD COLUMN IF NOT EXISTS; Postgres uses it so concurrent workers don't collide
+    if_not_exists = "IF NOT EXISTS " if dialect.name == "postgresql" else ""
+    sql = f"ALTER TABLE {table_name} ADD COLUMN {if_not_exists}{column.name} {column_type}"
+    # Existing rows get the model's scalar default instead of NULL
+    if column.default is not None and column.default.is_scalar:
+        value = literal(column.default.arg).compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        sql += f" DEFAULT {value}"
+    return sql
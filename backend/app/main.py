@@ -1,9 +1,13 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import documents, analysis, auth
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.api.endpoints import documents, analysis, auth, exports
 from app.core.config import settings
-from app.db.database import Base, engine
+from app.core.metrics import metrics_middleware
+from app.core.profiling import profiling_middleware
+from app.db.database import engine
+from app.db.migrations import upgrade_schema
 
 
 
@@ -16,7 +20,8 @@ app = FastAPI(
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    # Also adds columns introduced since an existing database was created
+    upgrade_schema(engine)
 
 # Configure CORS
 app.add_middleware(
@@ -27,10 +32,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profiling runs inside the metrics middleware so its overhead shows up in the latency histogram
+app.middleware("http")(profiling_middleware)
+app.middleware("http")(metrics_middleware)
+
 # Include routers
 app.include_router(documents.router, prefix="/api/documents", tags=["documents"])
 app.include_router(analysis.router, prefix="/api/analysis", tags=["analysis"])
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
+app.include_router(exports.router, prefix="/api/exports", tags=["exports"])
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 if __name__ == "__main__":
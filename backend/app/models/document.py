@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, LargeBinary, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -18,6 +18,12 @@ class Document(Base):
     # Document content after extraction
     content = Column(Text)
     
+    # MinHash signature used for near-duplicate detection
+    minhash = Column(LargeBinary, nullable=True)
+    
+    # Whether the document's terms are counted in corpus_terms (for keyphrase IDF)
+    terms_indexed = Column(Boolean, default=False)
+    
     # Relationships
     analyses = relationship("Analysis", back_populates="document")
     conversations = relationship("Conversation", back_populates="document")
@@ -30,6 +36,7 @@ class Analysis(Base):
     document_id = Column(Integer, ForeignKey("documents.id"))
     summary = Column(Text)
     key_topics = Column(Text)  # Stored as JSON string
+    strategy = Column(String, nullable=True)  # stuff, map_reduce or hierarchical
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -55,7 +62,90 @@ class Message(Base):
     conversation_id = Column(Integer, ForeignKey("conversations.id"))
     content = Column(Text)
     is_user = Column(Integer, default=1)  # 1 for user, 0 for AI
+    from_cache = Column(Boolean, default=False)  # AI answer served from the answer cache
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    conversation = relationship("Conversation", back_populates="messages")
\ No newline at end of file
+    conversation = relationship("Conversation", back_populates="messages")
+
+class IngestionBatch(Base):
+    __tablename__ = "ingestion_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, default="processing")  # processing, analyzing, completed, failed
+    total_files = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    items = relationship("IngestionItem", back_populates="batch", order_by="IngestionItem.id")
+
+
+class IngestionItem(Base):
+    __tablename__ = "ingestion_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(Integer, ForeignKey("ingestion_batches.id"), index=True)
+    filename = Column(String)
+    file_path = Column(String, nullable=True)
+    status = Column(String, default="pending")  # pending, analyzing, completed, failed
+    error = Column(Text, nullable=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
+    
+    # Relationships
+    batch = relationship("IngestionBatch", back_populates="items")
+
+
+class ReprocessRun(Base):
+    __tablename__ = "reprocess_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    stages = Column(String)  # Comma separated, e.g. "extract,analyze"
+    filters = Column(Text, default="{}")  # Stored as JSON string
+    status = Column(String, default="running")  # running, interrupted, failed, completed
+    last_document_id = Column(Integer, default=0)  # Checkpoint: documents are processed in id order
+    processed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    tokens = Column(Integer, default=0)  # Estimated from text length
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CorpusTerm(Base):
+    __tablename__ = "corpus_terms"
+
+    term = Column(String, primary_key=True)
+    document_count = Column(Integer, default=0)  # Documents containing the term, kept incrementally
+
+
+class DocumentLshBucket(Base):
+    __tablename__ = "document_lsh_buckets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), index=True)
+    bucket = Column(String, index=True)  # "<band>:<hash of the band's MinHash rows>"
+
+
+class ChunkSummary(Base):
+    __tablename__ = "chunk_summaries"
+
+    prompt_hash = Column(String, primary_key=True)  # SHA-256 of the full map prompt, chunk text included
+    summary = Column(Text)
+    topics = Column(Text)  # Stored as JSON string
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)  # For LRU eviction
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AnswerCacheEntry(Base):
+    __tablename__ = "answer_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), index=True)
+    question = Column(Text)
+    normalized_question = Column(Text)
+    embedding = Column(LargeBinary)  # Question vector from the local embedder
+    answer = Column(Text)
+    content_hash = Column(String)  # SHA-256 of the document content the answer was generated from
+    prompt_version = Column(String)
+    hits = Column(Integer, default=0)
+    last_used_at = Column(DateTime, default=datetime.utcnow)  # For LRU eviction
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class ChunkAnalysis(BaseModel):
+    """Structured output of the map step for one chunk of a document"""
+    summary: str
+    topics: List[str] = Field(default_factory=list)
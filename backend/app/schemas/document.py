@@ -40,6 +40,7 @@ class AnalysisCreate(AnalysisBase):
 
 class AnalysisResponse(AnalysisBase):
     id: int
+    strategy: Optional[str] = None
     created_at: datetime
     
     class Config:
@@ -57,6 +58,7 @@ class MessageCreate(MessageBase):
 
 class MessageResponse(MessageBase):
     id: int
+    from_cache: bool = False
     created_at: datetime
     
     class Config:
@@ -77,4 +79,31 @@ class ConversationResponse(ConversationBase):
     messages: List[MessageResponse] = []
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class IngestionItemResponse(BaseModel):
+    id: int
+    filename: str
+    status: str
+    error: Optional[str] = None
+    document_id: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class IngestionBatchResponse(BaseModel):
+    id: int
+    status: str
+    total_files: int
+    created_at: datetime
+    items: List[IngestionItemResponse] = []
+    
+    class Config:
+        from_attributes = True
+
+
+class NearDuplicateResponse(BaseModel):
+    id: int
+    filename: str
+    similarity: float
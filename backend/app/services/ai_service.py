@@ -1,14 +1,20 @@
+import hashlib
 import json
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.chains.summarize import load_summarize_chain
-from langchain.chains.question_answering import load_qa_chain
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.docstore.document import Document as LangchainDocument
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from pydantic import ValidationError
 from langchain.callbacks import LangChainTracer
 from langchain.smith import RunEvalConfig
 from langchain.callbacks.tracers.langchain import wait_for_all_tracers
 from app.core.config import settings
+from app.core.metrics import track_llm_call
+from app.schemas.analysis import ChunkAnalysis
+from app.services.chunking import split_text
+from app.services.model_router import ModelRouter
+from app.services.text_compressor import TextCompressor
 
 # Set LangSmith environment variables
 os.environ["LANGCHAIN_TRACING"] = str(settings.LANGSMITH_TRACING).lower()
@@ -16,14 +22,55 @@ os.environ["LANGCHAIN_ENDPOINT"] = settings.LANGSMITH_ENDPOINT
 os.environ["LANGCHAIN_API_KEY"] = settings.LANGSMITH_API_KEY
 os.environ["LANGCHAIN_PROJECT"] = settings.LANGSMITH_PROJECT
 
+# Map step: one call per chunk returns both a partial summary and candidate topics.
+# The "stuff" strategy sends the whole document through the same prompt.
+MAP_PROMPT = """Analyze the following {scope}.
+Respond with a single JSON object and nothing else, in this exact shape:
+{{"summary": "<concise summary of this text>", "topics": ["<topic>", "..."]}}
+List up to {max_topics} of the most important topics or key points in this text, most important first.
+
+Text:
+{text}"""
+
+# Reduce step: merge partial summaries into one; topics are merged locally.
+# Hierarchical reduction applies it to groups of summaries, then to the group results.
+REDUCE_PROMPT = """The following are summaries of consecutive parts of one document.
+Write a single concise summary of the whole document.
+
+Summaries:
+{summaries}
+
+Summary:"""
+
+# Markdown code fences some models wrap around JSON output
+CODE_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+
+# Question answering over the whole (possibly compressed) document in one call; the prompt of
+# langchain's "stuff" QA chain, which answered questions before per-stage model routing
+QA_PROMPT = """Use the following pieces of context to answer the question at the end. If you don't know the answer, just say that you don't know, don't try to make up an answer.
+
+{context}
+
+Question: {question}
+Helpful Answer:"""
+
+# Bump whenever the question answering prompt changes to invalidate cached answers
+# (a change of QA model invalidates them on its own)
+QA_PROMPT_VERSION = "2"
+
+# Summarization strategies, cheapest first
+STRATEGY_STUFF = "stuff"
+STRATEGY_MAP_REDUCE = "map_reduce"
+STRATEGY_HIERARCHICAL = "hierarchical"
+
 
 class AIService:
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=0.1
-        )
+    def __init__(self, llm=None):
+        # Models are chosen per stage by the router; a chat model passed in (e.g. a fake for
+        # benchmarks) is used for every stage instead
+        self.llm = llm
+        self.router = ModelRouter()
         
         # Set up LangSmith tracer
         self.callbacks = []
@@ -35,69 +82,176 @@ class AIService:
                 custom_evaluators=[]
             )
         
-    def _split_text(self, text: str):
-        """Split text into chunks for processing"""
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2000,  # Increased chunk size
-            chunk_overlap=200
-        )
-        return text_splitter.split_text(text)
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Cheap token estimate (about 4 characters per token) that needs no API call"""
+        return len(text or "") // 4
+    
+    def _split_text(self, text: str, chunk_size: int = None):
+        """Split text into content-defined chunks for processing"""
+        return split_text(text, chunk_size or settings.AI_CHUNK_SIZE)
+    
+    def _compress(self, text: str, enabled: bool, query: str = None) -> str:
+        """Shrink long documents locally with extractive compression before they reach the LLM"""
+        if not enabled or self.estimate_tokens(text) < settings.COMPRESSION_MIN_TOKENS:
+            return text
+        return TextCompressor.compress(text, settings.COMPRESSION_RATIO, query=query).text
+    
+    def plan_analysis(self, text: str) -> str:
+        """Choose the cheapest summarization strategy for the document size"""
+        tokens = self.estimate_tokens(text)
+        if tokens <= settings.AI_STUFF_MAX_TOKENS:
+            return STRATEGY_STUFF
+        if tokens <= settings.AI_MAP_REDUCE_MAX_TOKENS:
+            return STRATEGY_MAP_REDUCE
+        return STRATEGY_HIERARCHICAL
     
-    def analyze_document(self, text: str):
-        """Generate summary and key topics from document text"""
-        # Split text into chunks
-        texts = self._split_text(text)
-        docs = [LangchainDocument(page_content=t) for t in texts]
+    def model_name(self, stage: str) -> str:
+        if self.llm is not None:
+            return getattr(self.llm, "model", type(self.llm).__name__)
+        return self.router.model_name(stage)
+    
+    @track_llm_call
+    def _invoke(self, prompt: str, stage: str):
+        """Make one LLM call for a pipeline stage (map, reduce, stuff or qa)"""
+        config = {"callbacks": self.callbacks}
+        if self.llm is not None:
+            return self.llm.invoke(prompt, config=config)
+        return self.router.invoke(stage, prompt, config=config)
+    
+    def _generate(self, prompts: List[str], stage: str) -> List[str]:
+        """Run prompts through the LLM concurrently and return the response texts in order"""
+        if len(prompts) <= 1:
+            return [self._invoke(prompt, stage).content for prompt in prompts]
+        # A pool per call bounds concurrency within one analysis, like llm.batch(max_concurrency=...);
+        # nothing is queued behind other analyses or chat questions
+        with ThreadPoolExecutor(max_workers=min(settings.AI_MAX_CONCURRENCY, len(prompts))) as executor:
+            responses = list(executor.map(lambda prompt: self._invoke(prompt, stage), prompts))
+        return [response.content for response in responses]
+    
+    @staticmethod
+    def _parse_chunk_analysis(output: str) -> ChunkAnalysis:
+        """Validate a map step response against the ChunkAnalysis schema"""
+        cleaned = CODE_FENCE_RE.sub("", output.strip())
+        try:
+            return ChunkAnalysis.model_validate_json(cleaned)
+        except ValidationError:
+            # Keep the text as the partial summary so the chunk still counts towards the result
+            return ChunkAnalysis(summary=output.strip())
+    
+    def _map(self, prompts: List[str], stage: str, chunk_cache=None) -> List[ChunkAnalysis]:
+        """Run the map step, sending only prompts without a cached result to the LLM"""
+        # Results from another model are not reused
+        model = self.model_name(stage)
+        keys = [hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest() for prompt in prompts]
+        cached = chunk_cache.get_many(keys) if chunk_cache is not None else {}
+        
+        # Identical chunks (repeated boilerplate, tables, headers) are sent once
+        prompt_by_key = dict(zip(keys, prompts))
+        missing = [key for key in prompt_by_key if key not in cached]
+        outputs = self._generate([prompt_by_key[key] for key in missing], stage)
+        fresh = {key: self._parse_chunk_analysis(output) for key, output in zip(missing, outputs)}
+        if chunk_cache is not None:
+            chunk_cache.put_many(fresh)
+        
+        return [cached.get(key) or fresh[key] for key in keys]
+    
+    @staticmethod
+    def _rank_topics(candidates: List[List[str]], limit: int) -> List[str]:
+        """Deduplicate topic candidates from all chunks and rank them across the whole document"""
+        scores: Dict[str, float] = {}
+        spellings: Dict[str, Counter] = {}
         
-        # Generate summary with tracing
-        chain = load_summarize_chain(self.llm, chain_type="map_reduce")
-        summary = chain.run(input_documents=docs, callbacks=self.callbacks)
+        for chunk_topics in candidates:
+            seen = set()
+            for position, topic in enumerate(chunk_topics):
+                key = " ".join(re.sub(r"[^\w\s]", " ", topic.lower()).split())
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                
+                # A topic scores once per chunk it appears in, weighted by how early the chunk listed it
+                scores[key] = scores.get(key, 0.0) + 1.0 / (1 + position)
+                spellings.setdefault(key, Counter())[topic.strip()] += 1
         
-        # Extract key topics with tracing
-        topic_prompt = f"""Based on the following document, identify and list the 5-7 most important topics or key points.
-        Format the output as a JSON array of strings.
+        # Dict order is first appearance, so sorted() keeps earlier topics ahead on ties
+        ranked = sorted(scores, key=lambda key: scores[key], reverse=True)
+        return [spellings[key].most_common(1)[0][0] for key in ranked[:limit]]
+    
+    def _reduce_summaries(self, summaries: List[str]) -> str:
+        """Merge partial summaries, collapsing them in groups until one reduce call can take them all"""
+        while len(summaries) > 1:
+            # Pack consecutive summaries into groups that fit in one reduce prompt
+            groups = [[]]
+            group_tokens = 0
+            for summary in summaries:
+                tokens = self.estimate_tokens(summary)
+                if groups[-1] and group_tokens + tokens > settings.AI_COLLAPSE_MAX_TOKENS:
+                    groups.append([])
+                    group_tokens = 0
+                groups[-1].append(summary)
+                group_tokens += tokens
+            
+            # Every summary is over the limit on its own; merge pairs so each round still shrinks the list
+            if len(groups) == len(summaries):
+                groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+            
+            prompts = [REDUCE_PROMPT.format(summaries="\n\n".join(group)) for group in groups]
+            summaries = [output.strip() for output in self._generate(prompts, "reduce")]
         
-        Document: {text[:5000]}... (truncated)
+        return summaries[0]
+    
+    def analyze_document(self, text: str, strategy: str = None, compress: bool = None, chunk_cache=None):
+        """Generate summary and key topics from document text with the cheapest suitable strategy"""
+        # Compress first so the plan is made for the text the LLM will actually see
+        text = self._compress(text, settings.COMPRESS_ANALYSIS if compress is None else compress)
+        strategy = strategy or self.plan_analysis(text)
         
-        Key Topics:"""
+        # Split text into chunks; "stuff" sends the whole document as a single chunk
+        if strategy == STRATEGY_STUFF:
+            texts = [text] if text and text.strip() else []
+        elif strategy == STRATEGY_HIERARCHICAL:
+            texts = self._split_text(text, settings.AI_LARGE_CHUNK_SIZE)
+        else:
+            texts = self._split_text(text)
+        if not texts:
+            return {"summary": "No text content found in document.", "key_topics": "[]", "strategy": strategy}
         
-        topics_text = self.llm.predict(topic_prompt, callbacks=self.callbacks)
+        # Map: partial summary and candidate topics for every chunk
+        scope = "document" if len(texts) == 1 else "part of a document"
+        map_prompts = [
+            MAP_PROMPT.format(scope=scope, text=t, max_topics=settings.AI_MAX_TOPICS)
+            for t in texts
+        ]
+        # A single-call "stuff" analysis produces the final result, so it is its own stage
+        stage = "stuff" if strategy == STRATEGY_STUFF else "map"
+        chunk_results = self._map(map_prompts, stage, chunk_cache)
         
-        # Ensure topics are in JSON format
-        try:
-            # Clean up the response to ensure it's valid JSON
-            topics_text = topics_text.strip()
-            if not topics_text.startswith('['):
-                topics_text = topics_text[topics_text.find('['):]
-            if not topics_text.endswith(']'):
-                topics_text = topics_text[:topics_text.rfind(']')+1]
-                
-            topics = json.loads(topics_text)
-        except json.JSONDecodeError:
-            # Fallback if JSON parsing fails
-            topics = ["Topic extraction failed"]
+        # Reduce: merge the partial summaries; a single chunk is already the final summary
+        summary = self._reduce_summaries([result.summary for result in chunk_results])
+        
+        topics = self._rank_topics([result.topics for result in chunk_results], settings.AI_MAX_TOPICS)
         
         # Ensure all traces are properly recorded
         wait_for_all_tracers()
         
         return {
             "summary": summary,
-            "key_topics": json.dumps(topics)
+            "key_topics": json.dumps(topics),
+            "strategy": strategy
         }
     
-    def answer_question(self, question: str, document_text: str):
+    def answer_question(self, question: str, document_text: str, compress: bool = None):
         """Answer a question based on the document content"""
-        # Split text into chunks
-        texts = self._split_text(document_text)
-        docs = [LangchainDocument(page_content=t) for t in texts]
-        
-        # Create QA chain with tracing
-        chain = load_qa_chain(self.llm, chain_type="stuff")
+        # Keep the sentences most relevant to the question when compression is on
+        document_text = self._compress(
+            document_text, settings.COMPRESS_QA if compress is None else compress, query=question
+        )
         
-        # Get answer with tracing
-        answer = chain.run(input_documents=docs, question=question, callbacks=self.callbacks)
+        # Called directly in the request's thread, so a chat answer never waits behind background analyses
+        answer = self._invoke(QA_PROMPT.format(context=document_text, question=question), "qa").content
         
         # Ensure all traces are properly recorded
         wait_for_all_tracers()
         
-        return answer
\ No newline at end of file
+        return answer
@@ -1,27 +1,43 @@
 from app.models.document import Document, Analysis, Conversation, Message
 from app.services.ai_service import AIService
+from app.services.chunk_cache import ChunkSummaryCache
+from app.services.near_duplicate import NearDuplicateIndex
+from app.core.config import settings
 from sqlalchemy.orm import Session
+import json
 
 ai_service = AIService()
 
-def run_analysis(document_text: str, analysis_id: int, db: Session):
-    """Background task to run document analysis"""
+def run_analysis(document_text: str, analysis_id: int, db: Session) -> bool:
+    """Background task to run document analysis, returns whether it succeeded"""
     # Get the analysis record
     analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
     if not analysis:
         print(f"Analysis {analysis_id} not found")
-        return
+        return False
     
     try:
+        # A revision of an earlier document only sends its changed chunks to the LLM
+        document = db.query(Document).filter(Document.id == analysis.document_id).first()
+        near_duplicates = NearDuplicateIndex.find_near_duplicates(
+            db, document, settings.NEAR_DUPLICATE_THRESHOLD, limit=1
+        ) if document else []
+        chunk_cache = ChunkSummaryCache(db, read=bool(near_duplicates))
+        
         # Run AI analysis
-        result = ai_service.analyze_document(document_text)
+        result = ai_service.analyze_document(document_text, chunk_cache=chunk_cache)
         
         # Update the analysis record
         analysis.summary = result["summary"]
-        analysis.key_topics = result["key_topics"]
+        # Local topics from upload stay when LLM topics are disabled or came back empty
+        if settings.LLM_TOPICS_ENABLED and json.loads(result["key_topics"]):
+            analysis.key_topics = result["key_topics"]
+        analysis.strategy = result["strategy"]
         db.commit()
+        return True
     except Exception as e:
         # Update with error
         analysis.summary = f"Analysis failed: {str(e)}"
         db.commit()
         print(f"Analysis error: {e}")
+        return False
@@ -0,0 +1,115 @@
+import hashlib
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.models.document import Document, AnswerCacheEntry
+from app.services.ai_service import QA_PROMPT_VERSION
+from app.services.embedder import get_embedder
+from app.services.model_router import ModelRouter
+
+
+NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+NEGATION_RE = re.compile(r"\b(?:not|no|never|none|nor|neither|nothing|without|cannot)\b|n't\b")
+
+
+def _prompt_version() -> str:
+    # Answers from another model, or from compressed instead of full input, are never reused.
+    # Vectors from another embedder can't be compared, so switching embedders drops entries too.
+    compressed = "-compressed" if settings.COMPRESS_QA else ""
+    return f"{QA_PROMPT_VERSION}-{ModelRouter.model_name('qa')}{compressed}-{get_embedder().name}"
+
+
+def _qualifiers(question: str):
+    """Numbers and the number of negations in a question, which similarity scores barely notice"""
+    text = (question or "").lower()
+    numbers = Counter(number.replace(",", "") for number in NUMBER_RE.findall(text))
+    return numbers, len(NEGATION_RE.findall(text))
+
+
+def _same_qualifiers(question: str, other: str) -> bool:
+    return _qualifiers(question) == _qualifiers(other)
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """Per-document cache of answers, matched by normalized question text or embedding similarity"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def lookup(self, document: Document, question: str) -> Optional[str]:
+        """Return a cached answer to the question, or its closest rephrasing, if one is still valid"""
+        content_hash = _content_hash(document.content)
+        prompt_version = _prompt_version()
+
+        # Entries from an older document text or prompt can never be used again
+        self.db.query(AnswerCacheEntry).filter(
+            AnswerCacheEntry.document_id == document.id,
+            (AnswerCacheEntry.content_hash != content_hash) | (AnswerCacheEntry.prompt_version != prompt_version)
+        ).delete(synchronize_session=False)
+
+        entries = self.db.query(AnswerCacheEntry).filter(AnswerCacheEntry.document_id == document.id).all()
+        if not entries:
+            record_cache("answer", 0, 1)
+            return None
+
+        embedder = get_embedder()
+        normalized = embedder.normalize(question)
+        match = next((entry for entry in entries if entry.normalized_question == normalized), None)
+        if match is None:
+            # One matrix-vector product scores the question against every cached question
+            embeddings = np.vstack([embedder.from_bytes(entry.embedding) for entry in entries])
+            similarities = embeddings @ embedder.embed(question)
+            for index in np.argsort(-similarities):
+                if similarities[index] < embedder.similarity_threshold():
+                    break
+                # A question about another year or amount, or its negation, needs its own answer
+                if _same_qualifiers(question, entries[index].question):
+                    match = entries[index]
+                    break
+
+        if match is None:
+            record_cache("answer", 0, 1)
+            return None
+
+        record_cache("answer", 1, 0)
+        match.hits += 1
+        match.last_used_at = datetime.utcnow()
+        return match.answer
+
+    def store(self, document: Document, question: str, answer: str):
+        """Cache an answer and evict the least recently used entries beyond the per-document limit"""
+        embedder = get_embedder()
+        self.db.add(AnswerCacheEntry(
+            document_id=document.id,
+            question=question,
+            normalized_question=embedder.normalize(question),
+            embedding=embedder.to_bytes(embedder.embed(question)),
+            answer=answer,
+            content_hash=_content_hash(document.content),
+            prompt_version=_prompt_version(),
+            hits=0
+        ))
+        self.db.flush()
+
+        stale_ids = [
+            row[0] for row in self.db.query(AnswerCacheEntry.id).filter(
+                AnswerCacheEntry.document_id == document.id
+            ).order_by(AnswerCacheEntry.last_used_at.desc(), AnswerCacheEntry.id.desc()).offset(
+                settings.ANSWER_CACHE_MAX_ENTRIES
+            )
+        ]
+        if stale_ids:
+            self.db.query(AnswerCacheEntry).filter(
+                AnswerCacheEntry.id.in_(stale_ids)
+            ).delete(synchronize_session=False)
@@ -0,0 +1,267 @@
+import json
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from fastapi import UploadFile, HTTPException
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import BACKGROUND_QUEUE_DEPTH
+from app.db.database import SessionLocal
+from app.models.document import Document, Analysis, IngestionBatch, IngestionItem
+from app.services.document_processor import DocumentProcessor
+from app.services.keyphrase_extractor import KeyphraseExtractor
+from app.services.near_duplicate import NearDuplicateIndex
+from app.services.analysis_runner import run_analysis
+
+SUPPORTED_EXTENSIONS = ["pdf", "docx", "txt"]
+
+
+class BulkIngestionService:
+    @staticmethod
+    async def receive_files(files: List[UploadFile], db: Session) -> IngestionBatch:
+        """Stream uploaded files and ZIP entries to disk and record them as a pending batch"""
+        items = []
+        for upload_file in files:
+            if _file_extension(upload_file.filename) == "zip":
+                # Reading the archive is blocking IO, keep it off the event loop
+                remaining = settings.MAX_BULK_FILES - len(items)
+                try:
+                    entries = await run_in_threadpool(BulkIngestionService._save_zip_entries, upload_file, remaining)
+                except HTTPException:
+                    _remove_saved_files(items)
+                    raise
+                items.extend(entries)
+            else:
+                items.append(await run_in_threadpool(_save_entry, upload_file.file, upload_file.filename))
+
+            if len(items) > settings.MAX_BULK_FILES:
+                _remove_saved_files(items)
+                raise _too_many_files()
+
+        # Record the whole batch in a single transaction
+        batch = IngestionBatch(status="processing", total_files=len(items), items=items)
+        db.add(batch)
+        db.commit()
+        db.refresh(batch)
+
+        return batch
+
+    @staticmethod
+    def _save_zip_entries(upload_file: UploadFile, limit: int) -> List[IngestionItem]:
+        """Copy each supported entry of a ZIP archive to disk without loading it into memory.
+
+        Raises a 413 before anything is extracted when the archive has more than `limit` files.
+        """
+        try:
+            archive = zipfile.ZipFile(upload_file.file)
+        except zipfile.BadZipFile:
+            return [IngestionItem(filename=upload_file.filename, status="failed", error="Invalid ZIP archive")]
+
+        items = []
+        with archive:
+            # Skip directories and archive metadata such as __MACOSX/ resource forks
+            entries = [
+                entry for entry in archive.infolist()
+                if not entry.is_dir() and os.path.basename(entry.filename)
+                and not entry.filename.startswith("__MACOSX/")
+            ]
+            if len(entries) > limit:
+                raise _too_many_files()
+
+            for entry in entries:
+                filename = os.path.basename(entry.filename)
+
+                # Reject oversized entries from the header before decompressing anything
+                if entry.file_size > settings.MAX_UPLOAD_SIZE:
+                    items.append(IngestionItem(filename=filename, status="failed", error="File too large"))
+                    continue
+
+                with archive.open(entry) as source:
+                    items.append(_save_entry(source, filename))
+
+        return items
+
+    @staticmethod
+    def process_batch(batch_id: int):
+        """Background task: extract pending files in parallel, insert documents in batches, then analyze.
+
+        If a phase fails as a whole (a crashed extraction worker, a database error), the items it
+        had not finished and the batch are marked failed instead of staying in progress.
+        """
+        try:
+            queued = _extract_and_insert(batch_id)
+        except Exception as e:
+            _fail_batch(batch_id, f"Ingestion failed: {str(e)}")
+            return
+        if queued is None:
+            return
+
+        # Throttle analysis so a large batch cannot flood the LLM provider
+        queue_depth = BACKGROUND_QUEUE_DEPTH.labels("bulk_analysis")
+        queue_depth.inc(len(queued))
+
+        def analyze(ids):
+            queue_depth.dec()
+            _analyze_item(*ids)
+
+        try:
+            # Leaving the executor waits for every item, so only the failed ones are still analyzing
+            with ThreadPoolExecutor(max_workers=settings.BULK_ANALYSIS_CONCURRENCY) as executor:
+                list(executor.map(analyze, queued))
+        except Exception as e:
+            _fail_batch(batch_id, f"Analysis failed: {str(e)}")
+            return
+
+        db = SessionLocal()
+        try:
+            batch = db.query(IngestionBatch).filter(IngestionBatch.id == batch_id).first()
+            batch.status = "completed"
+            db.commit()
+        finally:
+            db.close()
+
+
+def _extract_and_insert(batch_id: int) -> Optional[List[Tuple[int, int, int]]]:
+    """Extract a batch's pending files and insert their documents, returning the ids to analyze"""
+    db = SessionLocal()
+    try:
+        batch = db.query(IngestionBatch).filter(IngestionBatch.id == batch_id).first()
+        if not batch:
+            print(f"Ingestion batch {batch_id} not found")
+            return None
+
+        items = db.query(IngestionItem).filter(
+            IngestionItem.batch_id == batch_id,
+            IngestionItem.status == "pending"
+        ).order_by(IngestionItem.id).all()
+
+        # Extraction is CPU bound, so it runs in a process pool; results come back in order
+        extracted = DocumentProcessor.extract_many(
+            [item.file_path for item in items],
+            max_workers=settings.BULK_EXTRACT_WORKERS
+        )
+
+        queued = []
+        pending = []
+        for item, (text_content, error) in zip(items, extracted):
+            if error is not None:
+                item.status = "failed"
+                item.error = error
+                continue
+
+            pending.append((item, text_content))
+            if len(pending) >= settings.BULK_INSERT_BATCH_SIZE:
+                queued.extend(_insert_documents(db, pending))
+                pending = []
+
+        if pending:
+            queued.extend(_insert_documents(db, pending))
+
+        batch.status = "analyzing"
+        db.commit()
+        return queued
+    finally:
+        db.close()
+
+
+def _fail_batch(batch_id: int, error: str):
+    """Mark a batch and every item it had not finished as failed"""
+    print(f"Ingestion batch {batch_id} error: {error}")
+    db = SessionLocal()
+    try:
+        db.query(IngestionItem).filter(
+            IngestionItem.batch_id == batch_id,
+            IngestionItem.status.in_(["pending", "analyzing"])
+        ).update({"status": "failed", "error": error}, synchronize_session=False)
+        db.query(IngestionBatch).filter(IngestionBatch.id == batch_id).update(
+            {"status": "failed"}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _file_extension(filename: str) -> str:
+    return filename.split(".")[-1].lower() if "." in filename else ""
+
+
+def _save_entry(source, filename: str) -> IngestionItem:
+    """Save one file to disk and return its ingestion item, recording failures instead of raising"""
+    file_extension = _file_extension(filename)
+    if file_extension not in SUPPORTED_EXTENSIONS:
+        return IngestionItem(filename=filename, status="failed", error=f"Unsupported file type: {file_extension}")
+
+    try:
+        file_path = DocumentProcessor.save_stream(source, filename)
+    except HTTPException as e:
+        return IngestionItem(filename=filename, status="failed", error=str(e.detail))
+
+    return IngestionItem(filename=filename, file_path=file_path, status="pending")
+
+
+def _too_many_files() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Too many files in one batch (limit {settings.MAX_BULK_FILES})")
+
+
+def _remove_saved_files(items: List[IngestionItem]):
+    for item in items:
+        if item.file_path and os.path.exists(item.file_path):
+            os.remove(item.file_path)
+
+
+def _insert_documents(db: Session, pending: List[Tuple[IngestionItem, str]]) -> List[Tuple[int, int, int]]:
+    """Insert documents and placeholder analyses for a group of items in one transaction"""
+    documents = [
+        Document(
+            filename=item.filename,
+            file_path=item.file_path,
+            file_type=_file_extension(item.filename),
+            content=text_content
+        )
+        for item, text_content in pending
+    ]
+    db.add_all(documents)
+    db.flush()
+
+    analyses = []
+    for document in documents:
+        NearDuplicateIndex.index_document(db, document)
+        key_topics = []
+        if settings.LOCAL_TOPICS_ENABLED:
+            key_topics = KeyphraseExtractor.index_document(db, document, settings.AI_MAX_TOPICS)
+        analyses.append(
+            Analysis(document_id=document.id, summary="Analysis in progress...", key_topics=json.dumps(key_topics))
+        )
+    db.add_all(analyses)
+    db.flush()
+
+    for (item, _), document in zip(pending, documents):
+        item.document_id = document.id
+        item.status = "analyzing"
+    db.commit()
+
+    # Only ids are queued, so the batch never keeps every document's text in memory
+    return [
+        (item.id, document.id, analysis.id)
+        for (item, _), document, analysis in zip(pending, documents, analyses)
+    ]
+
+
+def _analyze_item(item_id: int, document_id: int, analysis_id: int):
+    """Run analysis for one ingested document in its own session and record the outcome"""
+    db = SessionLocal()
+    try:
+        document = db.query(Document).filter(Document.id == document_id).first()
+        succeeded = document is not None and run_analysis(document.content, analysis_id, db)
+
+        item = db.query(IngestionItem).filter(IngestionItem.id == item_id).first()
+        item.status = "completed" if succeeded else "failed"
+        if not succeeded:
+            item.error = "Analysis failed"
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+import json
+from datetime import datetime
+from typing import Dict, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.db.database import dialect_insert
+from app.models.document import ChunkSummary
+from app.schemas.analysis import ChunkAnalysis
+
+
+class ChunkSummaryCache:
+    """Map step results keyed by a hash of the model and full map prompt, shared by all documents.
+
+    The key covers the model and prompt template as well as the chunk text, so changing
+    either invalidates old entries without any bookkeeping. Entries are not tied to a
+    document, so instead of being deleted with one, the least recently used are evicted
+    beyond CHUNK_SUMMARY_CACHE_MAX_ENTRIES.
+    """
+
+    def __init__(self, db: Session, read: bool = True):
+        self.db = db
+        # With read off, results are only written, ready for later revisions of the document
+        self.read = read
+        self.hits = 0
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, ChunkAnalysis]:
+        if not self.read:
+            return {}
+        keys = set(keys)
+        rows = self.db.query(ChunkSummary).filter(ChunkSummary.prompt_hash.in_(keys)).all()
+        self.hits += len(rows)
+        record_cache("chunk_summary", len(rows), len(keys) - len(rows))
+        if rows:
+            self.db.query(ChunkSummary).filter(
+                ChunkSummary.prompt_hash.in_([row.prompt_hash for row in rows])
+            ).update({"last_used_at": datetime.utcnow()}, synchronize_session=False)
+        return {
+            row.prompt_hash: ChunkAnalysis(summary=row.summary, topics=json.loads(row.topics))
+            for row in rows
+        }
+
+    def put_many(self, results: Dict[str, ChunkAnalysis]):
+        """Store results; the caller commits"""
+        if not results:
+            return
+        insert = dialect_insert(self.db)
+        statement = insert(ChunkSummary).values([
+            {"prompt_hash": key, "summary": result.summary, "topics": json.dumps(result.topics)}
+            for key, result in results.items()
+        ]).on_conflict_do_nothing(index_elements=[ChunkSummary.prompt_hash])
+        self.db.execute(statement)
+
+        stale = self.db.query(ChunkSummary.prompt_hash).order_by(
+            ChunkSummary.last_used_at.desc(), ChunkSummary.prompt_hash
+        ).offset(settings.CHUNK_SUMMARY_CACHE_MAX_ENTRIES)
+        self.db.query(ChunkSummary).filter(
+            ChunkSummary.prompt_hash.in_(stale.scalar_subquery())
+        ).delete(synchronize_session=False)
@@ -0,0 +1,121 @@
+import re
+import zlib
+from typing import Iterable, Iterator, List, Optional, Union
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+BLANK_LINE_RE = re.compile(r"\n\s*\n")
+# About one unit in this many closes a chunk once it has reached half the target size
+BOUNDARY_DIVISOR = 4
+
+
+def split_paragraphs(text: str) -> Iterator[str]:
+    """Yield the non-empty paragraphs of a text"""
+    for paragraph in BLANK_LINE_RE.split(text or ""):
+        if paragraph.strip():
+            yield paragraph.strip()
+
+
+def stream_paragraphs(pieces: Iterable[str], max_length: Optional[int] = None) -> Iterator[Union[str, Iterator[str]]]:
+    """Yield the paragraphs of a text given as consecutive pieces, as split_paragraphs would.
+
+    Only the paragraph in progress is buffered, not the whole text. Once that paragraph is
+    longer than `max_length`, it is yielded as an iterator over its lines instead, read as
+    the pieces arrive, so the buffer stays around `max_length` plus one piece (or the
+    longest line). Such an iterator must be exhausted before the next paragraph is requested.
+    """
+    pieces = iter(pieces)
+    buffer = ""
+
+    def lines():
+        nonlocal buffer
+        buffer = buffer.lstrip()
+        while True:
+            end = BLANK_LINE_RE.search(buffer)
+            if end is not None:
+                yield from buffer[:end.start()].rstrip().split("\n")
+                buffer = buffer[end.end():]
+                return
+            # The last line with text may still end the paragraph (and lose its trailing
+            # whitespace), so it is held back until more text arrives
+            held = buffer.split("\n")
+            last = max(i for i, line in enumerate(held) if line.strip())
+            if last:
+                yield from held[:last]
+                buffer = "\n".join(held[last:])
+            piece = next(pieces, None)
+            if piece is None:
+                yield from buffer.rstrip().split("\n")
+                buffer = ""
+                return
+            buffer += piece
+
+    for piece in pieces:
+        buffer += piece
+        # Everything up to the last blank line is made of complete paragraphs
+        last_break = None
+        for last_break in BLANK_LINE_RE.finditer(buffer):
+            pass
+        if last_break is not None:
+            yield from split_paragraphs(buffer[:last_break.start()])
+            buffer = buffer[last_break.end():]
+        if max_length is not None and len(buffer.strip()) > max_length:
+            yield lines()
+    yield from split_paragraphs(buffer)
+
+
+def content_defined_chunks(units: Iterable[Union[str, Iterator[str]]], chunk_size: int, separator: str = "\n\n") -> Iterator[str]:
+    """Group paragraphs (or lines) into chunks of at most `chunk_size` characters.
+
+    Chunk boundaries are chosen from the content of the paragraph that ends the chunk, not from
+    its position, so an edit only changes the chunks around it. Later chunks line up with the
+    chunks of the original document again, which lets their cached map results be reused.
+    """
+    current: List[str] = []
+    length = 0
+    for unit in units:
+        # A paragraph streamed line by line is already known to be too large for one chunk
+        if not isinstance(unit, str):
+            if current:
+                yield separator.join(current)
+                current, length = [], 0
+            yield from content_defined_chunks(unit, chunk_size, separator="\n")
+            continue
+
+        # A unit too large for one chunk is split on its own lines, then by characters
+        if len(unit) > chunk_size:
+            if current:
+                yield separator.join(current)
+                current, length = [], 0
+            if separator == "\n\n" and "\n" in unit:
+                yield from content_defined_chunks(unit.split("\n"), chunk_size, separator="\n")
+            else:
+                splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=0)
+                yield from splitter.split_text(unit)
+            continue
+
+        if current and length + len(separator) + len(unit) > chunk_size:
+            yield separator.join(current)
+            current, length = [], 0
+
+        current.append(unit)
+        length += len(unit) + (len(separator) if length else 0)
+
+        if length >= chunk_size // 2 and zlib.crc32(unit.encode("utf-8")) % BOUNDARY_DIVISOR == 0:
+            yield separator.join(current)
+            current, length = [], 0
+
+    if current:
+        yield separator.join(current)
+
+
+def split_text(text: str, chunk_size: int) -> List[str]:
+    """Split text into content-defined chunks"""
+    return list(content_defined_chunks(split_paragraphs(text), chunk_size))
+
+
+def split_stream(pieces: Iterable[str], chunk_size: int) -> Iterator[str]:
+    """Split text arriving in pieces (e.g. from DocumentProcessor.iter_text) into the same
+    chunks as split_text, without building the whole string"""
+    # Paragraphs too long for one chunk are split on lines either way, so they can be streamed
+    return content_defined_chunks(stream_paragraphs(pieces, max_length=chunk_size), chunk_size)
@@ -1,10 +1,47 @@
+import codecs
 import os
+import time
 import uuid
+import zipfile
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
 from fastapi import UploadFile, HTTPException
-from typing import List, Optional
+from typing import BinaryIO, Iterator, List, Optional, Tuple
 import PyPDF2
-import docx
+from lxml import etree
 from app.core.config import settings
+from app.core.metrics import observe_extraction, track_extraction
+
+try:
+    from charset_normalizer import from_bytes
+except ImportError:  # Optional, without it non-UTF-8 text is read as cp1252 or latin-1
+    from_bytes = None
+
+# Size of the blocks used when copying uploads to disk
+COPY_CHUNK_SIZE = 1024 * 1024
+# Characters read per block from text files
+TEXT_READ_SIZE = 64 * 1024
+# Bytes looked at when guessing the encoding of a non-UTF-8 text file
+ENCODING_SAMPLE_SIZE = 1024 * 1024
+
+# UTF-32 first: its little-endian BOM starts with the UTF-16 one
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+WORD_PARAGRAPH = WORD_NAMESPACE + "p"
+WORD_TABLE = WORD_NAMESPACE + "tbl"
+WORD_TEXT = WORD_NAMESPACE + "t"
+WORD_TAB = WORD_NAMESPACE + "tab"
+WORD_BREAKS = (WORD_NAMESPACE + "br", WORD_NAMESPACE + "cr")
+# Text boxes and other drawings are stored twice in mc:AlternateContent: as mc:Choice and
+# as a legacy mc:Fallback copy for older readers. Only the Choice is read.
+MARKUP_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
 
 
 class DocumentProcessor:
@@ -29,16 +66,86 @@ class DocumentProcessor:
         return file_path
     
     @staticmethod
+    def save_stream(source: BinaryIO, filename: str) -> str:
+        """Copy a file-like object to the upload directory in chunks and return the file path"""
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+        
+        file_extension = os.path.splitext(filename)[1]
+        unique_filename = f"{uuid.uuid4()}{file_extension}"
+        file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
+        
+        # Never hold more than one block in memory, and stop as soon as the limit is crossed
+        written = 0
+        try:
+            with open(file_path, "wb") as f:
+                while True:
+                    chunk = source.read(COPY_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > settings.MAX_UPLOAD_SIZE:
+                        raise HTTPException(status_code=413, detail="File too large")
+                    f.write(chunk)
+        except Exception:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        
+        return file_path
+    
+    @staticmethod
+    def extract_many(
+        file_paths: List[str],
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+        """Extract text from many files in a process pool, yielding (text, error) in input order"""
+        if not file_paths:
+            return
+        
+        # Long-running callers pass their own pool to avoid paying worker startup per call
+        if executor is not None:
+            results = executor.map(_extract_text_safely, file_paths, chunksize=4)
+            yield from DocumentProcessor._observe_results(file_paths, results)
+        else:
+            with DocumentProcessor.extraction_pool(max_workers) as pool:
+                results = pool.map(_extract_text_safely, file_paths, chunksize=4)
+                yield from DocumentProcessor._observe_results(file_paths, results)
+    
+    @staticmethod
+    def _observe_results(file_paths: List[str], results) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+        # Metrics recorded in worker processes are never scraped, so timings are recorded here
+        for file_path, (text, error, seconds) in zip(file_paths, results):
+            observe_extraction(file_path, seconds, error is not None)
+            yield text, error
+    
+    @staticmethod
+    def extraction_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """Create a process pool suitable for extract_many"""
+        # Spawn rather than fork: the server process has threads that must not be copied mid-lock
+        context = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+    
+    @staticmethod
+    @track_extraction
     def extract_text(file_path: str) -> str:
         """Extract text from a document file"""
+        return "".join(DocumentProcessor.iter_text(file_path))
+    
+    @staticmethod
+    def iter_text(file_path: str) -> Iterator[str]:
+        """Extract text incrementally: yields consecutive pieces that join into the full text.
+        
+        Pieces can be fed to chunking.split_stream without building the whole string.
+        """
         file_extension = os.path.splitext(file_path)[1].lower()
         
         if file_extension == ".pdf":
-            return DocumentProcessor._extract_from_pdf(file_path)
+            return DocumentProcessor._iter_pdf(file_path)
         elif file_extension == ".docx":
-            return DocumentProcessor._extract_from_docx(file_path)
+            return DocumentProcessor._iter_docx(file_path)
         elif file_extension == ".txt":
-            return DocumentProcessor._extract_from_txt(file_path)
+            return DocumentProcessor._iter_txt(file_path)
         else:
             raise HTTPException(
                 status_code=400, 
@@ -46,24 +153,120 @@ class DocumentProcessor:
             )
     
     @staticmethod
-    def _extract_from_pdf(file_path: str) -> str:
-        """Extract text from a PDF file"""
-        text = ""
+    def _iter_pdf(file_path: str) -> Iterator[str]:
+        """Extract text from a PDF file, one page at a time"""
         with open(file_path, "rb") as f:
             pdf_reader = PyPDF2.PdfReader(f)
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text()
-        return text
+            for page in pdf_reader.pages:
+                yield page.extract_text()
     
     @staticmethod
-    def _extract_from_docx(file_path: str) -> str:
-        """Extract text from a DOCX file"""
-        doc = docx.Document(file_path)
-        return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    def _iter_docx(file_path: str) -> Iterator[str]:
+        """Extract text from a DOCX file, one paragraph or table cell paragraph at a time.
+        
+        Streams word/document.xml instead of building python-docx's object model, and
+        drops each element once read so memory does not grow with the document.
+        """
+        first = True
+        with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as xml:
+            # Uploaded XML is untrusted: never expand entities or fetch anything (XXE), whatever the lxml version
+            events = etree.iterparse(
+                xml, events=("end",), tag=(WORD_PARAGRAPH, WORD_TABLE),
+                resolve_entities=False, no_network=True, load_dtd=False, huge_tree=False
+            )
+            for _, element in events:
+                if element.tag == WORD_PARAGRAPH and not _in_fallback(element):
+                    text = _paragraph_text(element)
+                    if text.strip():
+                        yield text if first else "\n\n" + text
+                        first = False
+                
+                element.clear()
+                parent = element.getparent()
+                while element.getprevious() is not None:
+                    del parent[0]
     
     @staticmethod
-    def _extract_from_txt(file_path: str) -> str:
-        """Extract text from a TXT file"""
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
\ No newline at end of file
+    def _iter_txt(file_path: str) -> Iterator[str]:
+        """Extract text from a TXT file in blocks, detecting its encoding first"""
+        # Text mode decodes incrementally and translates line endings like a plain read()
+        with open(file_path, "r", encoding=detect_text_encoding(file_path)) as f:
+            while True:
+                block = f.read(TEXT_READ_SIZE)
+                if not block:
+                    break
+                yield block
+
+
+def _in_fallback(element) -> bool:
+    # Ancestors stay in the tree until they end, so an enclosing mc:Fallback is still there
+    return next(element.iterancestors(MARKUP_FALLBACK), None) is not None
+
+
+def _paragraph_text(paragraph) -> str:
+    # Text of a w:p element; paragraphs nested in it (e.g. text boxes) were already read and cleared
+    parts = []
+    for node in paragraph.iter(WORD_TEXT, WORD_TAB, *WORD_BREAKS):
+        if node.tag == WORD_TEXT:
+            parts.append(node.text or "")
+        elif node.tag == WORD_TAB:
+            parts.append("\t")
+        else:
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _decodes_as(file_path: str, encoding: str) -> bool:
+    """Whether the whole file decodes with an encoding, checked in blocks"""
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        with open(file_path, "rb") as f:
+            while True:
+                block = f.read(COPY_CHUNK_SIZE)
+                decoder.decode(block, final=not block)
+                if not block:
+                    return True
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+
+def detect_text_encoding(file_path: str) -> str:
+    """Encoding of a text file: from its BOM, else the first of UTF-8, charset_normalizer's
+    guess and cp1252 that decodes the whole file, else latin-1, which accepts any bytes"""
+    with open(file_path, "rb") as f:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+    for bom, encoding in BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return encoding
+    
+    # Most uploads are UTF-8, which is checked before the slower guess
+    if _decodes_as(file_path, "utf-8"):
+        return "utf-8"
+    
+    candidates = []
+    if from_bytes is not None:
+        matches = from_bytes(sample)
+        best = matches.best()
+        # UTF-16/32 would have had a BOM
+        if best is not None and not best.encoding.startswith("utf"):
+            # Single-byte code pages are hard to tell apart on short samples; prefer the
+            # common Western one whenever it is a plausible candidate
+            plausible = {match.encoding for match in matches} | set(best.could_be_from_charset)
+            candidates.append("cp1252" if plausible & {"cp1252", "latin_1"} else best.encoding)
+    candidates.append("cp1252")
+    
+    for encoding in candidates:
+        if _decodes_as(file_path, encoding):
+            return encoding
+    return "latin-1"
+
+
+def _extract_text_safely(file_path: str) -> Tuple[Optional[str], Optional[str], float]:
+    """Process pool entry point: extract text and report failures and timing as values instead of raising"""
+    started = time.perf_counter()
+    try:
+        return DocumentProcessor.extract_text(file_path), None, time.perf_counter() - started
+    except HTTPException as e:
+        return None, str(e.detail), time.perf_counter() - started
+    except Exception as e:
+        return None, str(e), time.perf_counter() - started
@@ -0,0 +1,105 @@
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from app.core.config import settings
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Optional dependency, fall back to HashingEmbedder
+    SentenceTransformer = None
+
+EMBEDDING_DIM = 512
+TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """Local, dependency-free text embedder using signed feature hashing.
+
+    Features are words, word bigrams and character trigrams, so rephrasings that share
+    vocabulary or word stems land close together. Vectors are L2-normalized, so a dot
+    product is the cosine similarity. It only sees shared surface forms: at the default
+    threshold it matches repeated questions with small wording changes, while paraphrases
+    that use other words score far below it, so the cache is close to exact-match.
+    """
+
+    name = "hashing"
+
+    @staticmethod
+    def similarity_threshold() -> float:
+        return settings.ANSWER_CACHE_SIMILARITY
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, strip punctuation and collapse whitespace"""
+        return " ".join(TOKEN_RE.findall((text or "").lower()))
+
+    @staticmethod
+    def embed(text: str) -> np.ndarray:
+        words = HashingEmbedder.normalize(text).split()
+        features = list(words)
+        features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(f"#3{padded[i:i + 3]}" for i in range(len(padded) - 2))
+
+        vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+        for feature in features:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            # The top bit picks the sign so colliding features tend to cancel rather than add up
+            vector[digest % EMBEDDING_DIM] += 1.0 if digest & 0x80000000 else -1.0
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def to_bytes(vector: np.ndarray) -> bytes:
+        return vector.astype("<f4").tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype="<f4")
+
+
+class SentenceEmbedder:
+    """Local sentence-transformers model, used when the package is installed.
+
+    The model is loaded on first use. Vectors are L2-normalized like HashingEmbedder's.
+    """
+
+    normalize = staticmethod(HashingEmbedder.normalize)
+    to_bytes = staticmethod(HashingEmbedder.to_bytes)
+    from_bytes = staticmethod(HashingEmbedder.from_bytes)
+
+    def __init__(self, model_name: str):
+        self.name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def similarity_threshold() -> float:
+        # Model similarities are spread differently from hashed-feature overlap
+        return settings.ANSWER_CACHE_MODEL_SIMILARITY
+
+    def embed(self, text: str) -> np.ndarray:
+        with self._lock:
+            if self._model is None:
+                self._model = SentenceTransformer(self.name)
+        vector = self._model.encode(text or "", normalize_embeddings=True)
+        return np.asarray(vector, dtype=np.float32)
+
+
+_embedder = None
+
+
+def get_embedder():
+    """Return the configured sentence embedder, or HashingEmbedder when none is available"""
+    global _embedder
+    if _embedder is None:
+        if SentenceTransformer is not None and settings.ANSWER_CACHE_EMBEDDING_MODEL:
+            _embedder = SentenceEmbedder(settings.ANSWER_CACHE_EMBEDDING_MODEL)
+        else:
+            _embedder = HashingEmbedder
+    return _embedder
@@ -0,0 +1,181 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.database import dialect_insert
+from app.models.document import Document, CorpusTerm
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z'-]*[A-Za-z]|[,.;:!?()\[\]{}\"\n]")
+PHRASE_BREAKS = set(",.;:!?()[]{}\"\n")
+MAX_PHRASE_WORDS = 3
+MIN_WORD_LENGTH = 3
+# Terms are looked up and upserted in groups of this size to keep IN clauses bounded
+TERM_QUERY_BATCH = 500
+
+STOPWORDS = set("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each else even ever every few for from further
+had has have having he her here hers herself him himself his how however i if in into is it its itself just
+least less let like made make many may me might more most much must my myself no nor not now of off often on
+once only or other our ours ourselves out over own per perhaps rather same shall she should since so some
+such than that the their theirs them themselves then there therefore these they this those through thus to
+too under until up upon us used using very via was we were what when where whether which while who whom whose
+why will with within without would yet you your yours yourself yourselves also among another either etc
+""".split())
+
+
+class KeyphraseExtractor:
+    @staticmethod
+    def document_terms(text: str) -> Set[str]:
+        """Distinct content words of a text, the unit kept in corpus document frequencies"""
+        return {
+            token.lower() for token in WORD_RE.findall(text or "")
+            if token not in PHRASE_BREAKS and len(token) >= MIN_WORD_LENGTH and token.lower() not in STOPWORDS
+        }
+
+    @staticmethod
+    def extract(text: str, document_frequencies: Dict[str, int], total_documents: int, limit: int) -> List[str]:
+        """RAKE-style candidate phrases scored with corpus IDF, best first"""
+        # Candidates are runs of content words between stopwords and punctuation
+        phrases = []
+        current = []
+        for token in WORD_RE.findall(text or ""):
+            lowered = token.lower()
+            if token in PHRASE_BREAKS or lowered in STOPWORDS or len(token) < MIN_WORD_LENGTH:
+                if current:
+                    phrases.append(current)
+                    current = []
+            else:
+                current.append(token)
+                if len(current) == MAX_PHRASE_WORDS:
+                    phrases.append(current)
+                    current = []
+        if current:
+            phrases.append(current)
+        if not phrases:
+            return []
+
+        # RAKE word score: degree / frequency favours words that occur inside longer phrases
+        frequency = Counter()
+        degree = Counter()
+        for phrase in phrases:
+            for word in phrase:
+                frequency[word.lower()] += 1
+                degree[word.lower()] += len(phrase)
+
+        def idf(word: str) -> float:
+            return math.log((1 + total_documents) / (1 + document_frequencies.get(word, 0))) + 1.0
+
+        word_scores = {word: degree[word] / frequency[word] * idf(word) for word in frequency}
+
+        phrase_counts = Counter()
+        spellings = {}
+        for phrase in phrases:
+            key = " ".join(word.lower() for word in phrase)
+            phrase_counts[key] += 1
+            spellings.setdefault(key, " ".join(phrase))
+
+        # Repetition counts, but sub-linearly so one frequent word cannot dominate
+        scores = {
+            key: sum(word_scores[word] for word in key.split()) * (1 + math.log(count))
+            for key, count in phrase_counts.items()
+        }
+
+        # Drop phrases already covered by a better-ranked phrase, e.g. "notice" under "termination notice"
+        selected = []
+        for key in sorted(scores, key=lambda k: scores[k], reverse=True):
+            words = set(key.split())
+            if any(words <= set(chosen.split()) or set(chosen.split()) <= words for chosen in selected):
+                continue
+            selected.append(key)
+            if len(selected) == limit:
+                break
+
+        return [spellings[key] for key in selected]
+
+    @staticmethod
+    def index_document(db: Session, document: Document, limit: int) -> List[str]:
+        """Count a new document's terms in the corpus and return its key topics; the caller commits"""
+        terms = KeyphraseExtractor.add_document(db, document)
+
+        # Only documents whose terms are counted, so IDF stays consistent on databases
+        # that held documents before corpus terms existed
+        total_documents = db.query(func.count(Document.id)).filter(Document.terms_indexed.is_(True)).scalar() or 0
+        return KeyphraseExtractor.extract(
+            document.content, KeyphraseExtractor.load_frequencies(db, terms), total_documents, limit
+        )
+
+    @staticmethod
+    def add_document(db: Session, document: Document) -> Set[str]:
+        """Count a document's terms in the corpus unless they already are; the caller commits"""
+        terms = KeyphraseExtractor.document_terms(document.content)
+        if not document.terms_indexed:
+            KeyphraseExtractor.update_frequencies(db, {term: 1 for term in terms})
+            document.terms_indexed = True
+            db.flush()
+        return terms
+
+    @staticmethod
+    def remove_document(db: Session, document: Document):
+        """Take a document's terms out of the corpus, if they were counted; the caller commits"""
+        if not document.terms_indexed:
+            return
+        terms = KeyphraseExtractor.document_terms(document.content)
+        KeyphraseExtractor.update_frequencies(db, {term: -1 for term in terms})
+        document.terms_indexed = False
+        db.flush()
+
+    @staticmethod
+    def backfill(db: Session, documents: Iterable[Document]) -> int:
+        """Count the terms of documents stored before corpus terms existed; returns how many were added"""
+        added = 0
+        for document in documents:
+            if not document.terms_indexed:
+                KeyphraseExtractor.add_document(db, document)
+                added += 1
+        return added
+
+    @staticmethod
+    def load_frequencies(db: Session, terms: Iterable[str]) -> Dict[str, int]:
+        terms = list(terms)
+        frequencies = {}
+        for i in range(0, len(terms), TERM_QUERY_BATCH):
+            rows = db.query(CorpusTerm.term, CorpusTerm.document_count).filter(
+                CorpusTerm.term.in_(terms[i:i + TERM_QUERY_BATCH])
+            ).all()
+            frequencies.update(dict(rows))
+        return frequencies
+
+    @staticmethod
+    def update_frequencies(db: Session, term_counts: Dict[str, int]):
+        """Add per-term document counts (negative to remove) to the corpus; the caller commits"""
+        if not term_counts:
+            return
+
+        # Atomic upsert so concurrent uploads cannot lose increments or collide on new terms.
+        # Terms are written in sorted order so two transactions lock rows in the same order
+        # and cannot deadlock.
+        insert = dialect_insert(db)
+        items = sorted(term_counts.items())
+        for i in range(0, len(items), TERM_QUERY_BATCH):
+            group = items[i:i + TERM_QUERY_BATCH]
+            statement = insert(CorpusTerm).values([
+                {"term": term, "document_count": count} for term, count in group
+            ])
+            statement = statement.on_conflict_do_update(
+                index_elements=[CorpusTerm.term],
+                set_={"document_count": CorpusTerm.document_count + statement.excluded.document_count}
+            )
+            db.execute(statement)
+
+            # Terms no document contains any more are dropped so the table does not only grow
+            removed = [term for term, count in group if count < 0]
+            if removed:
+                db.query(CorpusTerm).filter(
+                    CorpusTerm.term.in_(removed),
+                    CorpusTerm.document_count <= 0
+                ).delete(synchronize_session=False)
@@ -0,0 +1,64 @@
+import threading
+from typing import Dict, Optional
+
+from google.api_core.exceptions import DeadlineExceeded
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from app.core.config import settings
+from app.core.metrics import LLM_FALLBACKS, llm_usage, record_llm_cost
+
+
+class ModelRouter:
+    """Picks the chat model for each pipeline stage and retries on the fallback model when it fails.
+
+    Stages are map, reduce, stuff and qa. Clients are created on first use and shared.
+    Each request carries its stage's timeout down to the API transport, so a slow request is
+    cancelled with DeadlineExceeded rather than left running.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, ChatGoogleGenerativeAI] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def model_name(stage: str) -> str:
+        return settings.AI_STAGE_MODELS.get(stage, settings.AI_MODEL)
+
+    @staticmethod
+    def fallback_name(stage: str) -> Optional[str]:
+        fallback = settings.AI_FALLBACK_MODEL
+        return fallback if fallback and fallback != ModelRouter.model_name(stage) else None
+
+    def _model(self, name: str) -> ChatGoogleGenerativeAI:
+        with self._lock:
+            if name not in self._models:
+                # Transient API errors are retried inside the client
+                self._models[name] = ChatGoogleGenerativeAI(
+                    model=name,
+                    google_api_key=settings.GOOGLE_API_KEY,
+                    temperature=0.1
+                )
+            return self._models[name]
+
+    def _call(self, stage: str, name: str, prompt: str, config: dict = None):
+        # The model passes extra invoke arguments on to generate_content, where timeout is the
+        # per-request deadline; the constructor's timeout setting is ignored by this client
+        timeout = settings.AI_STAGE_TIMEOUTS.get(stage)
+        kwargs = {"timeout": timeout} if timeout else {}
+        response = self._model(name).invoke(prompt, config=config, **kwargs)
+        record_llm_cost(stage, name, *llm_usage(prompt, response))
+        return response
+
+    def invoke(self, stage: str, prompt: str, config: dict = None):
+        """Call the stage's model, then the fallback model if the first one errors or times out"""
+        primary = self.model_name(stage)
+        fallback = self.fallback_name(stage)
+        try:
+            return self._call(stage, primary, prompt, config)
+        except Exception as e:
+            if fallback is None:
+                raise
+            reason = "deadline exceeded" if isinstance(e, DeadlineExceeded) else str(e)
+            print(f"Model {primary} failed for {stage}, retrying on {fallback}: {reason}")
+            LLM_FALLBACKS.labels(stage, primary).inc()
+            return self._call(stage, fallback, prompt, config)
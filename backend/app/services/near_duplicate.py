@@ -0,0 +1,135 @@
+import hashlib
+import re
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session, load_only
+
+from app.models.document import Document, DocumentLshBucket
+
+NUM_PERMUTATIONS = 128
+# 32 bands of 4 rows: a pair with Jaccard similarity s becomes a candidate with probability 1 - (1 - s^4)^32,
+# about 0.99 at s = 0.6 and 0.05 at s = 0.3
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_WORDS = 5
+# Shingles hashed per block, bounds the (permutations x shingles) matrix on long documents
+SHINGLE_BLOCK_SIZE = 8192
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+WORD_RE = re.compile(r"\w+")
+
+# Fixed seed: signatures are stored, so every process must use the same permutations
+_random = np.random.RandomState(20240101)
+_PERM_A = _random.randint(1, 1 << 31, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _random.randint(0, 1 << 31, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+class MinHasher:
+    @staticmethod
+    def shingle_hashes(text: str) -> np.ndarray:
+        """32-bit hashes of the distinct word 5-grams of a text"""
+        words = WORD_RE.findall((text or "").lower())
+        if not words:
+            return np.zeros(0, dtype=np.uint64)
+
+        # Hash each distinct word once, then combine windows with a vectorized polynomial hash
+        vocabulary = {word: zlib.crc32(word.encode("utf-8")) for word in set(words)}
+        word_hashes = np.fromiter(map(vocabulary.__getitem__, words), dtype=np.uint64, count=len(words))
+        width = min(SHINGLE_WORDS, len(words))
+        count = len(words) - width + 1
+        shingles = np.zeros(count, dtype=np.uint64)
+        for offset in range(width):
+            shingles = (shingles * np.uint64(1000003) + word_hashes[offset:offset + count]) & MAX_HASH
+        return np.unique(shingles)
+
+    @staticmethod
+    def signature(text: str) -> Optional[np.ndarray]:
+        """MinHash signature: the minimum of each random permutation over the text's shingles.
+
+        None for a text without words, which has nothing to compare.
+        """
+        shingles = MinHasher.shingle_hashes(text)
+        if len(shingles) == 0:
+            return None
+        signature = np.full(NUM_PERMUTATIONS, MAX_HASH, dtype=np.uint64)
+        for start in range(0, len(shingles), SHINGLE_BLOCK_SIZE):
+            block = shingles[start:start + SHINGLE_BLOCK_SIZE]
+            # a < 2^31 and shingles < 2^32, so the product stays below 2^63
+            permuted = (np.outer(_PERM_A, block) + _PERM_B[:, None]) % MERSENNE_PRIME & MAX_HASH
+            signature = np.minimum(signature, permuted.min(axis=1))
+        return signature.astype(np.uint32)
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(a == b))
+
+    @staticmethod
+    def band_buckets(signature: np.ndarray) -> List[str]:
+        """LSH bucket keys, one per band; documents sharing any bucket are candidates"""
+        buckets = []
+        for band in range(LSH_BANDS):
+            rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].astype("<u4").tobytes()
+            buckets.append(f"{band}:{hashlib.blake2b(rows, digest_size=8).hexdigest()}")
+        return buckets
+
+    @staticmethod
+    def to_bytes(signature: np.ndarray) -> bytes:
+        return signature.astype("<u4").tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    @staticmethod
+    def index_document(db: Session, document: Document):
+        """Store a document's signature and LSH buckets; the caller commits"""
+        signature = MinHasher.signature(document.content)
+        if signature is None:
+            # Empty documents would all share the same buckets and match each other
+            document.minhash = None
+            return
+        document.minhash = MinHasher.to_bytes(signature)
+        db.add_all([
+            DocumentLshBucket(document_id=document.id, bucket=bucket)
+            for bucket in MinHasher.band_buckets(signature)
+        ])
+
+    @staticmethod
+    def remove_document(db: Session, document_id: int):
+        db.query(DocumentLshBucket).filter(DocumentLshBucket.document_id == document_id).delete()
+
+    @staticmethod
+    def find_near_duplicates(db: Session, document: Document, threshold: float, limit: int = 10) -> List[Tuple[Document, float]]:
+        """Documents whose estimated similarity to this one is at least `threshold`, most similar first"""
+        if document.minhash is None:
+            return []
+        signature = MinHasher.from_bytes(document.minhash)
+
+        # LSH narrows the search to documents sharing a band; only those signatures are compared
+        candidate_ids = [
+            row[0] for row in db.query(DocumentLshBucket.document_id).filter(
+                DocumentLshBucket.bucket.in_(MinHasher.band_buckets(signature)),
+                DocumentLshBucket.document_id != document.id
+            ).distinct()
+        ]
+        if not candidate_ids:
+            return []
+
+        matches = []
+        # Skip loading the candidates' content, only the signatures are needed
+        candidates = db.query(Document).options(
+            load_only(Document.id, Document.filename, Document.minhash)
+        ).filter(Document.id.in_(candidate_ids))
+        for candidate in candidates:
+            similarity = MinHasher.similarity(signature, MinHasher.from_bytes(candidate.minhash))
+            if similarity >= threshold:
+                matches.append((candidate, similarity))
+
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches[:limit]
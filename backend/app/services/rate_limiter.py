@@ -0,0 +1,25 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls out to at most `rate` per `period` seconds"""
+
+    def __init__(self, rate: float, period: float = 60.0):
+        self.interval = period / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = time.monotonic()
+
+    def acquire(self):
+        """Block until the caller is allowed to make its next call"""
+        if not self.interval:
+            return
+
+        # Reserve the next slot under the lock, then sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+
+        if wait > 0:
+            time.sleep(wait)
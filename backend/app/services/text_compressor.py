@@ -0,0 +1,190 @@
+import hashlib
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# A paragraph is a run of non-blank lines
+PARAGRAPH_RE = re.compile(r"(?:[^\n]*\S[^\n]*(?:\n|$))+")
+# A sentence runs up to terminal punctuation (plus closing quotes/brackets) or the end of the paragraph
+SENTENCE_RE = re.compile(r"[^.!?]+(?:[.!?]+[\"')\]]*|$)")
+TOKEN_RE = re.compile(r"\w+")
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+# Paragraphs at least this similar to an earlier one are dropped as near-duplicates
+DUPLICATE_SIMILARITY = 0.9
+# Rows of the paragraph similarity matrix computed at once, bounds memory on long documents
+SIMILARITY_BLOCK_SIZE = 512
+
+
+class CompressedText(NamedTuple):
+    text: str
+    spans: List[Tuple[int, int]]  # (start, end) offsets of each kept sentence in the source text
+    original_length: int
+    duplicates_removed: int
+
+    def source_offset(self, position: int) -> int:
+        """Map a character position in the compressed text back to the source text"""
+        cursor = 0
+        for start, end in self.spans:
+            length = end - start
+            if position < cursor + length:
+                return start + position - cursor
+            # Kept sentences are joined by a single separator character
+            cursor += length + 1
+        return self.original_length
+
+
+class TextCompressor:
+    @staticmethod
+    def compress(text: str, ratio: float, query: Optional[str] = None) -> CompressedText:
+        """Keep the most central sentences, about `ratio` of the text, after dropping duplicate paragraphs"""
+        paragraphs = [(m.start(), m.end()) for m in PARAGRAPH_RE.finditer(text)]
+        kept_paragraphs = TextCompressor._drop_duplicate_paragraphs(text, paragraphs)
+        duplicates_removed = len(paragraphs) - len(kept_paragraphs)
+
+        # Sentences with source offsets, trimmed of surrounding whitespace
+        sentences = []  # (start, end, paragraph index)
+        for index, (p_start, p_end) in enumerate(kept_paragraphs):
+            for m in SENTENCE_RE.finditer(text, p_start, p_end):
+                start, end = m.start(), m.end()
+                while start < end and text[start].isspace():
+                    start += 1
+                while end > start and text[end - 1].isspace():
+                    end -= 1
+                if end > start:
+                    sentences.append((start, end, index))
+
+        if not sentences:
+            return CompressedText("", [], len(text), duplicates_removed)
+
+        matrix, vocabulary = TextCompressor._tfidf([text[s:e] for s, e, _ in sentences])
+        personalization = None
+        if query:
+            query_vector = TextCompressor._query_vector(query, vocabulary, matrix.shape[1])
+            personalization = matrix @ query_vector
+        scores = TextCompressor._textrank(matrix, personalization)
+
+        # Take the best sentences until the budget is used, then restore document order
+        budget = ratio * len(text)
+        selected = []
+        used = 0
+        for i in np.argsort(-scores, kind="stable"):
+            if used >= budget:
+                break
+            start, end, _ = sentences[i]
+            selected.append(i)
+            used += end - start + 1
+        selected.sort()
+
+        # Sentences of one paragraph are joined by a space, paragraphs by a newline
+        parts = []
+        spans = []
+        previous_paragraph = None
+        for i in selected:
+            start, end, paragraph = sentences[i]
+            if parts:
+                parts.append("\n" if paragraph != previous_paragraph else " ")
+            parts.append(text[start:end])
+            spans.append((start, end))
+            previous_paragraph = paragraph
+
+        return CompressedText("".join(parts), spans, len(text), duplicates_removed)
+
+    @staticmethod
+    def _drop_duplicate_paragraphs(text: str, paragraphs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Remove repeated boilerplate (exact after normalization) and near-duplicate paragraphs"""
+        # Exact pass: digits are masked so "Page 3 of 40" headers collapse into one
+        seen = set()
+        unique = []
+        for start, end in paragraphs:
+            normalized = re.sub(r"\d+", "0", " ".join(text[start:end].lower().split()))
+            digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+            if digest not in seen:
+                seen.add(digest)
+                unique.append((start, end))
+
+        if len(unique) < 2:
+            return unique
+
+        # Near-duplicate pass: cosine similarity of TF-IDF vectors, computed in row blocks
+        matrix, _ = TextCompressor._tfidf([text[s:e] for s, e in unique])
+        keep = np.ones(len(unique), dtype=bool)
+        transposed = matrix.T.tocsc()
+        for block_start in range(0, len(unique), SIMILARITY_BLOCK_SIZE):
+            block = (matrix[block_start:block_start + SIMILARITY_BLOCK_SIZE] @ transposed).toarray()
+            for offset, row in enumerate(block):
+                i = block_start + offset
+                if not keep[i]:
+                    continue
+                # Compare only against earlier paragraphs that are still kept
+                earlier = np.flatnonzero(row[:i] >= DUPLICATE_SIMILARITY)
+                if earlier.size and keep[earlier].any():
+                    keep[i] = False
+
+        return [paragraph for paragraph, kept in zip(unique, keep) if kept]
+
+    @staticmethod
+    def _tfidf(texts: List[str]) -> Tuple[sparse.csr_matrix, Dict[str, int]]:
+        """Row-normalized sublinear TF-IDF matrix of the texts and its vocabulary"""
+        vocabulary: Dict[str, int] = {}
+        rows, cols, counts = [], [], []
+        for row, t in enumerate(texts):
+            term_counts: Dict[int, int] = {}
+            for token in TOKEN_RE.findall(t.lower()):
+                column = vocabulary.setdefault(token, len(vocabulary))
+                term_counts[column] = term_counts.get(column, 0) + 1
+            rows.extend([row] * len(term_counts))
+            cols.extend(term_counts.keys())
+            counts.extend(term_counts.values())
+
+        tf = sparse.csr_matrix(
+            (1.0 + np.log(np.asarray(counts, dtype=np.float64)), (rows, cols)),
+            shape=(len(texts), max(len(vocabulary), 1))
+        )
+        document_frequency = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log((1.0 + len(texts)) / (1.0 + document_frequency)) + 1.0
+        matrix = tf @ sparse.diags(idf)
+
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ matrix, vocabulary
+
+    @staticmethod
+    def _query_vector(query: str, vocabulary: Dict[str, int], size: int) -> np.ndarray:
+        vector = np.zeros(size)
+        for token in TOKEN_RE.findall(query.lower()):
+            if token in vocabulary:
+                vector[vocabulary[token]] += 1.0
+        return vector
+
+    @staticmethod
+    def _textrank(matrix: sparse.csr_matrix, personalization: Optional[np.ndarray] = None) -> np.ndarray:
+        """PageRank over the sentence cosine-similarity graph without materializing the graph"""
+        n = matrix.shape[0]
+        transposed = matrix.T.tocsr()
+
+        # Similarity S = X X^T with self-loops removed; rows are unit length so diag(S) is 1 (or 0 if empty)
+        self_similarity = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+        degree = matrix @ (transposed @ np.ones(n)) - self_similarity
+        degree[degree <= 0] = 1.0
+
+        if personalization is None or not personalization.any():
+            teleport = np.full(n, 1.0 / n)
+        else:
+            # Bias towards query-relevant sentences, but give every sentence a small chance
+            teleport = personalization + personalization.max() * 0.01
+            teleport = teleport / teleport.sum()
+
+        scores = np.full(n, 1.0 / n)
+        for _ in range(MAX_ITERATIONS):
+            weighted = scores / degree
+            spread = matrix @ (transposed @ weighted) - self_similarity * weighted
+            updated = (1 - DAMPING) * teleport + DAMPING * spread
+            if np.abs(updated - scores).sum() < TOLERANCE:
+                return updated
+            scores = updated
+        return scores
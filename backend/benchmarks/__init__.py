@@ -0,0 +1,7 @@
+"""Offline benchmarks. Run from the backend directory, e.g. `python -m benchmarks.bench_strategy`."""
+import os
+
+# Settings require API keys at import time; benchmarks never call the real APIs
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("LANGSMITH_API_KEY", "")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
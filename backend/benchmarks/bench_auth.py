@@ -0,0 +1,130 @@
+"""Load test for authentication: concurrent logins (and how responsive the server stays while
+bcrypt runs) and authenticated requests with and without the token cache.
+
+Requests go through the ASGI app in-process on one event loop, like a single uvicorn worker.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import percentiles
+
+USERNAME = "benchmark-user"
+PASSWORD = "benchmark-password"
+
+
+async def run_concurrently(concurrency: int, total: int, request) -> list:
+    """Run `total` requests with `concurrency` in flight and return their latencies"""
+    timings = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            await request()
+            timings.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings
+
+
+async def probe(client, stop: asyncio.Event, timings: list, interval: float = 0.01):
+    """Hit a trivial endpoint repeatedly; its latency shows how long the event loop is blocked"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        (await client.get("/api/auth/status")).raise_for_status()
+        timings.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+
+async def bench_login(client, concurrency: int, total: int) -> dict:
+    async def login():
+        response = await client.post("/api/auth/token", data={"username": USERNAME, "password": PASSWORD})
+        response.raise_for_status()
+
+    stop = asyncio.Event()
+    probe_timings = []
+    probe_task = asyncio.create_task(probe(client, stop, probe_timings))
+    started = time.perf_counter()
+    timings = await run_concurrently(concurrency, total, login)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+
+    result = {
+        "concurrency": concurrency,
+        "logins_per_s": round(total / elapsed, 2),
+        "login": percentiles(timings),
+        "status_probe": percentiles(probe_timings),
+    }
+    print(f"login    c={concurrency:>3}: {result['logins_per_s']:>7} logins/s  p50 {result['login']['p50_ms']:>8} ms  "
+          f"| /status while logging in: p50 {result['status_probe']['p50_ms']:>7} ms "
+          f"max {result['status_probe']['max_ms']:>8} ms")
+    return result
+
+
+async def bench_me(client, token: str, concurrency: int, total: int, cached: bool) -> dict:
+    from app.core.config import settings
+    from app.core.security import token_cache
+
+    token_cache.clear()
+    token_cache.ttl = settings.AUTH_CACHE_TTL_SECONDS if cached else 0
+
+    async def me():
+        (await client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})).raise_for_status()
+
+    started = time.perf_counter()
+    timings = await run_concurrently(concurrency, total, me)
+    elapsed = time.perf_counter() - started
+    result = {"concurrency": concurrency, "cached": cached, "requests_per_s": round(total / elapsed, 1), **percentiles(timings)}
+    print(f"/me      c={concurrency:>3} cache={'on ' if cached else 'off'}: {result['requests_per_s']:>8} req/s  "
+          f"p50 {result['p50_ms']:>7} ms  p95 {result['p95_ms']:>7} ms")
+    return result
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.db.database import Base, engine
+    from app.main import app
+
+    Base.metadata.create_all(bind=engine)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        response = await client.post("/api/auth/signup", json={"username": USERNAME, "password": PASSWORD})
+        response.raise_for_status()
+        response = await client.post("/api/auth/token", data={"username": USERNAME, "password": PASSWORD})
+        token = response.json()["access_token"]
+
+        results = {"login": [], "me": []}
+        for concurrency in args.concurrency:
+            results["login"].append(await bench_login(client, concurrency, args.logins))
+        for concurrency in args.concurrency:
+            for cached in (False, True):
+                results["me"].append(await bench_me(client, token, concurrency, args.requests, cached))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Requests in flight")
+    parser.add_argument("--logins", type=int, default=32, help="Logins per concurrency level")
+    parser.add_argument("--requests", type=int, default=1000, help="Authenticated requests per concurrency level")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so the app is only imported once these are set
+    work_dir = tempfile.mkdtemp(prefix="docanalyzer-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    os.environ["UPLOAD_DIR"] = os.path.join(work_dir, "uploads")
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Measure the token reduction and latency cost of local extractive pre-compression."""
+import argparse
+import json
+import time
+
+from benchmarks.corpus import add_boilerplate, generate_text
+from app.services.ai_service import AIService
+from app.services.text_compressor import TextCompressor
+
+DEFAULT_SIZES = [2000, 10000, 50000, 200000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Document sizes in tokens")
+    parser.add_argument("--ratio", type=float, default=0.5, help="Fraction of the text to keep")
+    parser.add_argument("--query", help="Also measure query-aware compression with this question")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size, the fastest is reported")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'tokens':>8} {'kept':>8} {'reduction':>10} {'dup paras':>10} {'latency':>10}")
+    for size in args.sizes:
+        text = add_boilerplate(generate_text(size, seed=size), seed=size)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            compressed = TextCompressor.compress(text, args.ratio, query=args.query)
+            timings.append(time.perf_counter() - started)
+
+        original_tokens = AIService.estimate_tokens(text)
+        kept_tokens = AIService.estimate_tokens(compressed.text)
+        result = {
+            "tokens": original_tokens,
+            "kept_tokens": kept_tokens,
+            "reduction": round(1 - kept_tokens / max(original_tokens, 1), 3),
+            "duplicates_removed": compressed.duplicates_removed,
+            "latency_ms": round(min(timings) * 1000, 1),
+        }
+        results.append(result)
+        print(f"{result['tokens']:>8} {kept_tokens:>8} {result['reduction']:>9.1%} "
+              f"{result['duplicates_removed']:>10} {result['latency_ms']:>8.1f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Measure local key-topic extraction throughput on large documents."""
+import argparse
+import json
+import time
+
+from benchmarks.corpus import generate_text
+from app.core.config import settings
+from app.services.keyphrase_extractor import KeyphraseExtractor
+
+DEFAULT_SIZES = [1000, 10000, 100000, 500000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Document sizes in tokens")
+    parser.add_argument("--corpus", type=int, default=200, help="Documents used to build corpus frequencies")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size, the fastest is reported")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    # Corpus document frequencies, as kept incrementally in the corpus_terms table
+    frequencies = {}
+    for seed in range(args.corpus):
+        for term in KeyphraseExtractor.document_terms(generate_text(500, seed=10000 + seed)):
+            frequencies[term] = frequencies.get(term, 0) + 1
+
+    results = []
+    print(f"{'tokens':>8} {'latency':>10} {'MB/s':>8}  topics")
+    for size in args.sizes:
+        text = generate_text(size, seed=size)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            topics = KeyphraseExtractor.extract(text, frequencies, args.corpus, settings.AI_MAX_TOPICS)
+            timings.append(time.perf_counter() - started)
+
+        latency = min(timings)
+        megabytes_per_second = len(text) / 1e6 / latency
+        results.append({
+            "tokens": size,
+            "latency_ms": round(latency * 1000, 2),
+            "mb_per_s": round(megabytes_per_second, 2),
+            "topics": topics,
+        })
+        print(f"{size:>8} {latency * 1000:>8.2f}ms {megabytes_per_second:>8.2f}  {', '.join(topics[:4])}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
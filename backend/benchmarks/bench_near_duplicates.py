@@ -0,0 +1,102 @@
+"""Precision, recall and throughput of MinHash/LSH near-duplicate detection on a synthetic corpus.
+
+Each family is a base document plus revisions with a growing share of rewritten paragraphs.
+Ground truth is the exact Jaccard similarity of the word 5-gram shingle sets.
+"""
+import argparse
+import json
+import random
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from benchmarks.corpus import generate_text
+from app.core.config import settings
+from app.services.near_duplicate import MinHasher
+
+EDIT_RATES = [0.02, 0.05, 0.1, 0.2, 0.4]
+
+
+def revise(text: str, rate: float, seed: int) -> str:
+    """Rewrite about `rate` of the paragraphs of a text"""
+    rng = random.Random(seed)
+    paragraphs = text.split("\n\n")
+    for i in rng.sample(range(len(paragraphs)), max(1, int(len(paragraphs) * rate))):
+        paragraphs[i] = generate_text(len(paragraphs[i]) // 4, seed=rng.randrange(1 << 30))
+    return "\n\n".join(paragraphs)
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    union = len(np.union1d(a, b))
+    return len(np.intersect1d(a, b, assume_unique=True)) / union if union else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--families", type=int, default=100, help="Base documents, each with one revision per edit rate")
+    parser.add_argument("--tokens", type=int, default=3000, help="Size of each document in tokens")
+    parser.add_argument("--threshold", type=float, default=settings.NEAR_DUPLICATE_THRESHOLD)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    documents = []  # (family, text)
+    for family in range(args.families):
+        base = generate_text(args.tokens, seed=family)
+        documents.append((family, base))
+        for rate in EDIT_RATES:
+            documents.append((family, revise(base, rate, seed=family * 100 + int(rate * 100))))
+
+    # Signatures: the cost paid once per document at ingestion
+    started = time.perf_counter()
+    signatures = [MinHasher.signature(text) for _, text in documents]
+    signing_time = time.perf_counter() - started
+
+    # LSH index, the in-memory equivalent of the document_lsh_buckets table
+    buckets = defaultdict(set)
+    for doc_id, signature in enumerate(signatures):
+        for bucket in MinHasher.band_buckets(signature):
+            buckets[bucket].add(doc_id)
+
+    started = time.perf_counter()
+    predicted = set()
+    for doc_id, signature in enumerate(signatures):
+        candidates = set().union(*(buckets[b] for b in MinHasher.band_buckets(signature))) - {doc_id}
+        for other in candidates:
+            if other > doc_id and MinHasher.similarity(signature, signatures[other]) >= args.threshold:
+                predicted.add((doc_id, other))
+    query_time = time.perf_counter() - started
+
+    # Ground truth: unrelated families share no shingles, so only pairs within a family can match
+    shingles = [MinHasher.shingle_hashes(text) for _, text in documents]
+    actual = set()
+    by_family = defaultdict(list)
+    for doc_id, (family, _) in enumerate(documents):
+        by_family[family].append(doc_id)
+    for members in by_family.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if jaccard(shingles[a], shingles[b]) >= args.threshold:
+                    actual.add((a, b))
+
+    true_positives = len(predicted & actual)
+    megabytes = sum(len(text) for _, text in documents) / 1e6
+    result = {
+        "documents": len(documents),
+        "threshold": args.threshold,
+        "precision": round(true_positives / len(predicted), 3) if predicted else 1.0,
+        "recall": round(true_positives / len(actual), 3) if actual else 1.0,
+        "signatures_per_s": round(len(documents) / signing_time, 1),
+        "signing_mb_per_s": round(megabytes / signing_time, 2),
+        "query_ms": round(query_time / len(documents) * 1000, 3),
+    }
+    for key, value in result.items():
+        print(f"{key:>18}: {value}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
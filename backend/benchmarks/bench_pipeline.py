@@ -0,0 +1,251 @@
+"""End-to-end benchmarks of the API against a local database: extraction per format, upload
+throughput, search/listing/history latency as the corpus grows and analysis time with a fake LLM.
+
+Uses a throwaway SQLite database unless --database-url is given. A Postgres database must be
+empty (or passed with --reset, which drops all tables) so runs stay comparable.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+
+from benchmarks.corpus import FORMATS, generate_corpus, generate_text
+
+DEFAULT_CORPUS_SIZES = [100, 1000, 5000]
+DEFAULT_ANALYSIS_SIZES = [2000, 30000, 150000]
+SEARCH_QUERIES = ["invoice", "renewal obligation", "no-such-term"]
+
+
+def percentiles(timings: list) -> dict:
+    ordered = sorted(timings)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def timed(func, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return percentiles(timings)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_extraction(work_dir: str, files: int, tokens: int) -> dict:
+    from app.services.document_processor import DocumentProcessor
+
+    results = {}
+    for file_format in FORMATS:
+        paths = generate_corpus(os.path.join(work_dir, "extract", file_format), files, tokens, [file_format])
+        size = sum(os.path.getsize(path) for path in paths)
+        timings = []
+        for path in paths:
+            started = time.perf_counter()
+            DocumentProcessor.extract_text(path)
+            timings.append(time.perf_counter() - started)
+        total = sum(timings)
+        results[file_format] = {
+            "files": files,
+            "files_per_s": round(files / total, 1),
+            "mb_per_s": round(size / 1e6 / total, 2),
+            **percentiles(timings),
+        }
+        print(f"extract {file_format:>4}: {results[file_format]['files_per_s']:>8} files/s "
+              f"{results[file_format]['mb_per_s']:>7} MB/s  p50 {results[file_format]['p50_ms']} ms")
+    return results
+
+
+def bench_upload(client, work_dir: str, files: int, tokens: int) -> dict:
+    paths = generate_corpus(os.path.join(work_dir, "upload"), files, tokens, seed=1000)
+    size = sum(os.path.getsize(path) for path in paths)
+    timings = []
+    for path in paths:
+        with open(path, "rb") as f:
+            started = time.perf_counter()
+            response = client.post("/api/documents/upload", files={"file": (os.path.basename(path), f)})
+            timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    total = sum(timings)
+    result = {
+        "files": files,
+        "docs_per_s": round(files / total, 1),
+        "mb_per_s": round(size / 1e6 / total, 2),
+        **percentiles(timings),
+    }
+    print(f"upload: {result['docs_per_s']} docs/s {result['mb_per_s']} MB/s  p50 {result['p50_ms']} ms")
+    return result
+
+
+def bench_analysis(client, llm, sizes: list) -> list:
+    from app.db.database import SessionLocal
+    from app.models.document import Document, Analysis
+
+    results = []
+    for size in sizes:
+        db = SessionLocal()
+        try:
+            document = Document(filename=f"analysis_{size}.txt", file_path=f"synthetic/analysis_{size}.txt", file_type="txt",
+                                content=generate_text(size, seed=size))
+            db.add(document)
+            db.commit()
+            document_id = document.id
+        finally:
+            db.close()
+
+        llm.reset()
+        # The test client returns once background tasks finish, so this covers the whole analysis
+        started = time.perf_counter()
+        client.post(f"/api/analysis/documents/{document_id}/analyze").raise_for_status()
+        elapsed = time.perf_counter() - started
+
+        db = SessionLocal()
+        try:
+            analysis = db.query(Analysis).filter(Analysis.document_id == document_id).order_by(Analysis.id.desc()).first()
+            strategy = analysis.strategy
+        finally:
+            db.close()
+        results.append({
+            "tokens": size,
+            "strategy": strategy,
+            "llm_calls": llm.calls,
+            "input_tokens": llm.input_tokens,
+            "latency_s": round(elapsed, 3),
+        })
+        print(f"analysis {size:>7} tokens: {strategy:>13} {llm.calls:>4} calls {elapsed:>7.2f}s")
+    return results
+
+
+def grow_corpus(target: int, tokens: int):
+    """Insert documents with finished analyses directly until the corpus has `target` documents"""
+    from app.db.database import SessionLocal
+    from app.models.document import Document, Analysis
+
+    # A pool of texts keeps generation cheap for large corpora
+    texts = [generate_text(tokens, seed=5000 + i) for i in range(50)]
+    db = SessionLocal()
+    try:
+        count = db.query(Document).count()
+        while count < target:
+            batch = min(500, target - count)
+            documents = [
+                # file_path is unique; these rows have no file behind them
+                Document(filename=f"corpus_{count + i}.txt", file_path=f"synthetic/corpus_{count + i}.txt", file_type="txt",
+                         content=texts[(count + i) % len(texts)], tags=json.dumps(["synthetic"]))
+                for i in range(batch)
+            ]
+            db.add_all(documents)
+            db.flush()
+            db.add_all([
+                Analysis(document_id=document.id, summary="Synthetic summary", key_topics="[]", strategy="stuff")
+                for document in documents
+            ])
+            db.commit()
+            count += batch
+    finally:
+        db.close()
+
+
+def bench_scaling(client, sizes: list, tokens: int, repeat: int) -> list:
+    from app.api.endpoints.documents import search_documents
+    from app.db.database import SessionLocal
+
+    results = []
+    for size in sizes:
+        grow_corpus(size, tokens)
+        db = SessionLocal()
+        try:
+            # Called directly: GET /api/documents/search is matched by /{document_id} first
+            search = {
+                query: timed(lambda: search_documents(query, db), repeat)
+                for query in SEARCH_QUERIES
+            }
+        finally:
+            db.close()
+        listing = timed(lambda: client.get("/api/documents/").raise_for_status(), repeat)
+        history = timed(lambda: client.get("/api/analysis/history").raise_for_status(), repeat)
+        results.append({"documents": size, "search": search, "list_documents": listing, "history": history})
+        print(f"corpus {size:>6}: search p50 {search[SEARCH_QUERIES[0]]['p50_ms']:>9} ms  "
+              f"list p50 {listing['p50_ms']:>9} ms  history p50 {history['p50_ms']:>9} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to benchmark against (default: temporary SQLite file)")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    parser.add_argument("--tokens", type=int, default=2000, help="Size of generated documents in tokens")
+    parser.add_argument("--extract-files", type=int, default=20, help="Files per format for extraction")
+    parser.add_argument("--uploads", type=int, default=30, help="Files uploaded through the API")
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=DEFAULT_CORPUS_SIZES,
+                        help="Corpus sizes at which search, listing and history are measured")
+    parser.add_argument("--analysis-sizes", type=int, nargs="+", default=DEFAULT_ANALYSIS_SIZES,
+                        help="Document sizes in tokens for end-to-end analysis")
+    parser.add_argument("--repeat", type=int, default=10, help="Requests per latency measurement")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM latency per call in seconds")
+    parser.add_argument("--latency-per-1k", type=float, default=0.0, help="Extra fake LLM latency per 1k input tokens")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="docanalyzer-bench-")
+    # Settings are read at import time, so the app is only imported once these are set
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    os.environ["UPLOAD_DIR"] = os.path.join(work_dir, "uploads")
+
+    from fastapi.testclient import TestClient
+    from benchmarks.fake_llm import FakeLLM
+    from app.db.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models.document import Document
+    from app.services import analysis_runner
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(Document).count():
+            raise SystemExit("The database already has documents; use an empty database or pass --reset")
+    finally:
+        db.close()
+
+    print(f"Working directory: {work_dir} ({engine.dialect.name})")
+    results = {
+        # The URL may carry credentials, only the dialect is recorded
+        "config": {**vars(args), "database_url": None, "database": engine.dialect.name},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "commit": git_commit()},
+    }
+
+    with TestClient(app) as client:
+        results["extraction"] = bench_extraction(work_dir, args.extract_files, args.tokens)
+
+        # Uploads also run their background analysis; an instant LLM keeps that out of the numbers
+        analysis_runner.ai_service.llm = FakeLLM(latency=0)
+        results["upload"] = bench_upload(client, work_dir, args.uploads, args.tokens)
+
+        llm = FakeLLM(latency=args.latency, latency_per_1k_tokens=args.latency_per_1k)
+        analysis_runner.ai_service.llm = llm
+        results["analysis"] = bench_analysis(client, llm, args.analysis_sizes)
+
+        results["scaling"] = bench_scaling(client, args.corpus_sizes, args.tokens, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
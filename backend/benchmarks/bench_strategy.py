@@ -0,0 +1,51 @@
+"""Compare LLM calls and latency of the adaptive strategy planner against always using map-reduce."""
+import argparse
+import json
+import time
+
+from benchmarks.corpus import generate_text
+from benchmarks.fake_llm import FakeLLM
+from app.services.ai_service import AIService, STRATEGY_MAP_REDUCE
+
+DEFAULT_SIZES = [200, 2000, 8000, 30000, 100000, 300000]
+
+
+def measure(service: AIService, llm: FakeLLM, text: str, strategy: str = None) -> dict:
+    llm.reset()
+    started = time.perf_counter()
+    result = service.analyze_document(text, strategy=strategy)
+    return {
+        "strategy": result["strategy"],
+        "llm_calls": llm.calls,
+        "input_tokens": llm.input_tokens,
+        "latency_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Document sizes in tokens")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM latency per call in seconds")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    llm = FakeLLM(latency=args.latency)
+    service = AIService(llm=llm)
+
+    results = []
+    print(f"{'tokens':>8} {'plan':>13} {'calls':>6} {'latency':>8} | {'map_reduce calls':>16} {'latency':>8}")
+    for size in args.sizes:
+        text = generate_text(size, seed=size)
+        adaptive = measure(service, llm, text)
+        baseline = measure(service, llm, text, strategy=STRATEGY_MAP_REDUCE)
+        results.append({"tokens": size, "adaptive": adaptive, "map_reduce": baseline})
+        print(f"{size:>8} {adaptive['strategy']:>13} {adaptive['llm_calls']:>6} {adaptive['latency_s']:>7.2f}s | "
+              f"{baseline['llm_calls']:>16} {baseline['latency_s']:>7.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
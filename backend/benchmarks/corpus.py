@@ -0,0 +1,117 @@
+import os
+import random
+import textwrap
+from typing import List
+
+import docx
+
+FORMATS = ["txt", "docx", "pdf"]
+# Text lines per generated PDF page, at 12pt leading on a US letter page
+PDF_LINES_PER_PAGE = 54
+
+# Small fixed vocabulary so generated text has realistic repetition
+VOCABULARY = (
+    "agreement party payment termination clause notice period liability service provider customer "
+    "invoice delivery warranty confidential information report revenue quarter growth market risk "
+    "policy compliance audit employee contract renewal obligation schedule data security incident "
+    "budget forecast project milestone review approval department regulation license fee"
+).split()
+
+
+def generate_text(tokens: int, seed: int = 0) -> str:
+    """Generate deterministic prose of roughly `tokens` tokens (about 4 characters each)"""
+    rng = random.Random(seed)
+    paragraphs = []
+    length = 0
+    while length < tokens * 4:
+        sentences = []
+        for _ in range(rng.randint(3, 7)):
+            words = [rng.choice(VOCABULARY) for _ in range(rng.randint(8, 20))]
+            sentences.append(" ".join(words).capitalize() + ".")
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[: tokens * 4]
+
+
+def add_boilerplate(text: str, every: int = 4, seed: int = 0) -> str:
+    """Insert page headers/footers and repeated disclaimers, as extracted PDFs tend to have"""
+    rng = random.Random(seed)
+    disclaimer = "This document is confidential and intended solely for the use of the addressee."
+    paragraphs = text.split("\n\n")
+    output = []
+    for i, paragraph in enumerate(paragraphs):
+        if i % every == 0:
+            page = i // every + 1
+            output.append(f"ACME Corporation - Quarterly Report - Page {page} of {len(paragraphs) // every + 1}")
+            if rng.random() < 0.5:
+                output.append(disclaimer)
+        output.append(paragraph)
+    return "\n\n".join(output)
+
+
+def write_txt(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_docx(path: str, text: str):
+    document = docx.Document()
+    for paragraph in text.split("\n\n"):
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, text: str):
+    """Write a minimal text-only PDF (Helvetica, one text object per page) that PyPDF2 can extract"""
+    lines = []
+    for paragraph in text.split("\n\n"):
+        lines.extend(textwrap.wrap(paragraph, 90) or [""])
+        lines.append("")
+    pages = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)] or [[]]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        body = "BT /F1 10 Tf 12 TL 50 750 Td " + " ".join(f"({_pdf_escape(line)}) ' " for line in page_lines) + "ET"
+        stream = body.encode("latin-1", "replace")
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {len(objects) + 2} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+WRITERS = {"txt": write_txt, "docx": write_docx, "pdf": write_pdf}
+
+
+def generate_corpus(directory: str, count: int, tokens: int, formats: List[str] = FORMATS, seed: int = 0) -> List[str]:
+    """Write `count` documents of about `tokens` tokens each, cycling through the formats"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        file_format = formats[i % len(formats)]
+        path = os.path.join(directory, f"doc_{seed + i:05d}.{file_format}")
+        WRITERS[file_format](path, generate_text(tokens, seed=seed + i))
+        paths.append(path)
+    return paths
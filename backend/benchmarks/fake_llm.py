@@ -0,0 +1,63 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from app.services.ai_service import AIService
+
+WORD_RE = re.compile(r"[A-Za-z]{4,}")
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeLLM:
+    """Deterministic stand-in for ChatGoogleGenerativeAI with configurable latency and output size"""
+
+    def __init__(self, latency: float = 0.05, latency_per_1k_tokens: float = 0.0, output_tokens: int = 120):
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.output_tokens = output_tokens
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens_total = 0
+
+    def _respond(self, prompt: str) -> str:
+        input_tokens = AIService.estimate_tokens(prompt)
+        time.sleep(self.latency + self.latency_per_1k_tokens * input_tokens / 1000)
+
+        # Derive the output from the prompt so repeated runs produce identical results
+        words = [word.lower() for word in WORD_RE.findall(prompt)]
+        common = [word for word, _ in Counter(words).most_common(7)]
+        seed = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        filler = " ".join((common or ["text"]) * (self.output_tokens // max(len(common), 1)))
+        summary = f"Summary {seed[:8]}: {filler}"[: self.output_tokens * 4]
+
+        if '"topics"' in prompt:
+            content = json.dumps({"summary": summary, "topics": common})
+        else:
+            content = summary
+
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens_total += AIService.estimate_tokens(content)
+        return content
+
+    def invoke(self, prompt, config=None) -> FakeMessage:
+        return FakeMessage(self._respond(str(prompt)))
+
+    def batch(self, prompts: List, config=None) -> List[FakeMessage]:
+        max_concurrency = (config or {}).get("max_concurrency") or len(prompts) or 1
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(self.invoke, prompts))
@@ -1,8 +1,9 @@
-from app.db.database import Base, engine
+from app.db.database import engine
+from app.db.migrations import upgrade_schema
 
 def create_tables():
     print("Creating tables...")
-    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     print("Tables created successfully!")
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+from app.models.document import Document, Analysis, ReprocessRun
+from app.services.ai_service import AIService
+from app.services.analysis_runner import run_analysis
+from app.services.document_processor import DocumentProcessor
+from app.services.keyphrase_extractor import KeyphraseExtractor
+from app.services.near_duplicate import NearDuplicateIndex
+from app.services.rate_limiter import RateLimiter
+
+STAGES = ["extract", "terms", "analyze"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Re-extract and/or re-analyze existing documents. Runs checkpoint to the "
+                    "database, so an interrupted run can be continued with --resume."
+    )
+    parser.add_argument("--stages", default="extract,analyze",
+                        help="Comma separated stages to run: extract, terms, analyze (default: extract,analyze). "
+                             "Chunking happens inside analysis, so chunking changes need 'analyze'. "
+                             "'terms' counts documents missing from the keyphrase corpus without re-extracting.")
+    parser.add_argument("--file-type", help="Only documents of this type (pdf, docx, txt)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only documents uploaded on or after this date")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Only documents uploaded before this date")
+    parser.add_argument("--ids", help="Only these comma separated document ids")
+    parser.add_argument("--resume", type=int, metavar="RUN_ID", help="Continue an earlier run from its checkpoint")
+    parser.add_argument("--list", action="store_true", help="List previous runs and exit")
+    parser.add_argument("--batch-size", type=int, default=50, help="Documents per checkpoint (default: 50)")
+    parser.add_argument("--workers", type=int, default=settings.BULK_EXTRACT_WORKERS,
+                        help="Processes used for extraction")
+    parser.add_argument("--llm-concurrency", type=int, default=settings.BULK_ANALYSIS_CONCURRENCY,
+                        help="Analyses running at once")
+    parser.add_argument("--llm-rate", type=float, default=0,
+                        help="Maximum analyses started per minute (default: unlimited)")
+    return parser.parse_args()
+
+
+def filtered_documents(db, filters: dict):
+    """Build the document query for a run's filters"""
+    query = db.query(Document)
+    if filters.get("file_type"):
+        query = query.filter(Document.file_type == filters["file_type"])
+    if filters.get("since"):
+        query = query.filter(Document.upload_date >= datetime.fromisoformat(filters["since"]))
+    if filters.get("until"):
+        query = query.filter(Document.upload_date < datetime.fromisoformat(filters["until"]))
+    if filters.get("ids"):
+        query = query.filter(Document.id.in_(filters["ids"]))
+    return query
+
+
+def start_run(db, args) -> ReprocessRun:
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown or not stages:
+        raise SystemExit(f"Unknown stages: {', '.join(unknown) or '(none given)'}")
+
+    filters = {
+        "file_type": args.file_type,
+        "since": args.since.isoformat() if args.since else None,
+        "until": args.until.isoformat() if args.until else None,
+        "ids": [int(i) for i in args.ids.split(",")] if args.ids else None,
+    }
+    run = ReprocessRun(stages=",".join(stages), filters=json.dumps(filters), status="running")
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def list_runs(db):
+    for run in db.query(ReprocessRun).order_by(ReprocessRun.id).all():
+        print(f"#{run.id} [{run.status}] stages={run.stages} processed={run.processed} "
+              f"failed={run.failed} checkpoint=document {run.last_document_id} filters={run.filters}")
+
+
+def analyze_one(document_id: int, limiter: RateLimiter) -> bool:
+    """Re-analyze one document in its own session, reusing its analysis record if there is one.
+
+    Returns whether it succeeded; errors are reported, never raised, so one document cannot stop the run.
+    """
+    limiter.acquire()
+    db = SessionLocal()
+    try:
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if document is None:
+            print(f"Document {document_id} was deleted during the run, skipped")
+            return False
+        analysis = db.query(Analysis).filter(Analysis.document_id == document_id).first()
+        if not analysis:
+            analysis = Analysis(document_id=document_id, summary="Analysis in progress...", key_topics="[]")
+            db.add(analysis)
+            db.commit()
+        return run_analysis(document.content, analysis.id, db)
+    except Exception as e:
+        print(f"Analysis failed for document {document_id}: {e}")
+        return False
+    finally:
+        db.close()
+
+
+def reprocess(db, run: ReprocessRun, args):
+    """Process a run to the end and record how it finished: completed, interrupted or failed"""
+    try:
+        _process_batches(db, run, args)
+    except BaseException as e:
+        # A run must never be left "running"; the checkpoint of the last finished batch is kept
+        db.rollback()
+        run.status = "interrupted" if isinstance(e, KeyboardInterrupt) else "failed"
+        db.commit()
+        raise
+
+    run.status = "completed"
+    db.commit()
+    print(f"Run #{run.id} completed")
+
+
+def _process_batches(db, run: ReprocessRun, args):
+    stages = run.stages.split(",")
+    filters = json.loads(run.filters)
+    limiter = RateLimiter(args.llm_rate)
+
+    started = time.monotonic()
+    done = 0
+    tokens = 0
+
+    extraction_pool = DocumentProcessor.extraction_pool(args.workers) if "extract" in stages else None
+    llm_pool = ThreadPoolExecutor(max_workers=args.llm_concurrency)
+    try:
+        while True:
+            documents = filtered_documents(db, filters).filter(
+                Document.id > run.last_document_id
+            ).order_by(Document.id).limit(args.batch_size).all()
+            if not documents:
+                break
+
+            failed_ids = set()
+            if "extract" in stages:
+                extracted = DocumentProcessor.extract_many(
+                    [document.file_path for document in documents],
+                    executor=extraction_pool
+                )
+                for document, (text_content, error) in zip(documents, extracted):
+                    if error is not None:
+                        print(f"Extraction failed for document {document.id}: {error}")
+                        failed_ids.add(document.id)
+                    else:
+                        # Keep the near-duplicate index and corpus term counts in step with the new text;
+                        # only the counts the old text actually contributed are taken out
+                        NearDuplicateIndex.remove_document(db, document.id)
+                        KeyphraseExtractor.remove_document(db, document)
+                        document.content = text_content
+                        NearDuplicateIndex.index_document(db, document)
+                        if settings.LOCAL_TOPICS_ENABLED:
+                            KeyphraseExtractor.add_document(db, document)
+                db.commit()
+
+            if "terms" in stages:
+                KeyphraseExtractor.backfill(db, documents)
+                db.commit()
+
+            if "analyze" in stages:
+                to_analyze = [document.id for document in documents if document.id not in failed_ids]
+                results = llm_pool.map(lambda document_id: analyze_one(document_id, limiter), to_analyze)
+                for document_id, succeeded in zip(to_analyze, results):
+                    if not succeeded:
+                        failed_ids.add(document_id)
+
+            # Estimated from the text length, not counted by the model
+            batch_tokens = sum(AIService.estimate_tokens(document.content) for document in documents)
+
+            # Checkpoint after every batch; a resumed run starts after the last committed document
+            run.last_document_id = documents[-1].id
+            run.processed += len(documents)
+            run.failed += len(failed_ids)
+            run.tokens += batch_tokens
+            db.commit()
+
+            done += len(documents)
+            tokens += batch_tokens
+            elapsed = max(time.monotonic() - started, 1e-9)
+            print(f"Run #{run.id}: {run.processed} processed, {run.failed} failed, "
+                  f"checkpoint at document {run.last_document_id} | "
+                  f"{done / elapsed:.2f} docs/s, ~{tokens / elapsed:.0f} tokens/s (estimated)")
+    finally:
+        llm_pool.shutdown()
+        if extraction_pool is not None:
+            extraction_pool.shutdown()
+
+
+def main():
+    args = parse_args()
+
+    # The run table may be newer than the database, make sure it exists
+    ReprocessRun.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        if args.list:
+            list_runs(db)
+            return
+
+        if args.resume:
+            run = db.query(ReprocessRun).filter(ReprocessRun.id == args.resume).first()
+            if not run:
+                raise SystemExit(f"Run {args.resume} not found")
+            if run.status == "completed":
+                print(f"Run #{run.id} is already completed")
+                return
+            run.status = "running"
+            db.commit()
+            print(f"Resuming run #{run.id} after document {run.last_document_id}")
+        else:
+            run = start_run(db, args)
+            print(f"Started run #{run.id} (stages: {run.stages})")
+
+        try:
+            reprocess(db, run, args)
+        except KeyboardInterrupt:
+            print(f"Interrupted. Continue with: python reprocess.py --resume {run.id}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
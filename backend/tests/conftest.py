@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when app modules are imported, so the environment is set up first
+_work_dir = tempfile.mkdtemp(prefix="docanalyzer-tests-")
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("LANGSMITH_API_KEY", "")
+os.environ.setdefault("LANGSMITH_TRACING", "false")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_work_dir, 'test.db')}")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_work_dir, "uploads"))
+
+
+@pytest.fixture
+def db():
+    """Session on the app's database, emptied after the test. Foreign keys are enforced like on Postgres."""
+    from sqlalchemy import event
+
+    from app.db.database import Base, SessionLocal, engine
+    from app.db.migrations import upgrade_schema
+
+    if engine.dialect.name == "sqlite" and not event.contains(engine, "connect", _enable_foreign_keys):
+        event.listen(engine, "connect", _enable_foreign_keys)
+        engine.dispose()
+    upgrade_schema(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+def _enable_foreign_keys(connection, _):
+    connection.execute("PRAGMA foreign_keys=ON")
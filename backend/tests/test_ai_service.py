@@ -0,0 +1,163 @@
+import json
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.ai_service import (
+    REDUCE_PROMPT, STRATEGY_HIERARCHICAL, STRATEGY_MAP_REDUCE, STRATEGY_STUFF, AIService
+)
+from benchmarks.corpus import generate_text
+from benchmarks.fake_llm import FakeLLM, FakeMessage
+
+
+class RecordingLLM:
+    """Answers every prompt with a fixed reply and records the prompts"""
+
+    def __init__(self, reply: str = "merged"):
+        self.reply = reply
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt, config=None):
+        with self._lock:
+            self.prompts.append(prompt)
+        return FakeMessage(self.reply)
+
+
+@pytest.mark.parametrize("output, summary, topics", [
+    ('{"summary": "Payment terms.", "topics": ["payment", "invoices"]}', "Payment terms.", ["payment", "invoices"]),
+    ('```json\n{"summary": "Fenced.", "topics": ["a"]}\n```', "Fenced.", ["a"]),
+    ('{"summary": "No topics."}', "No topics.", []),
+])
+def test_parse_chunk_analysis(output, summary, topics):
+    result = AIService._parse_chunk_analysis(output)
+    assert (result.summary, result.topics) == (summary, topics)
+
+
+@pytest.mark.parametrize("output", [
+    "The chunk is about payment terms.",
+    '{"summary": "Cut off", "topics": ["pay',
+    '{"topics": ["missing summary"]}',
+    '{"summary": "Bad topics", "topics": "payment"}',
+])
+def test_malformed_chunk_analysis_keeps_the_text_as_summary(output):
+    result = AIService._parse_chunk_analysis("  " + output + "\n")
+    assert (result.summary, result.topics) == (output, [])
+
+
+def test_rank_topics_merges_spellings_and_ranks_across_chunks():
+    candidates = [
+        ["Payment Terms", "Liability", "payment terms"],
+        ["Termination", "payment terms!", "Warranty"],
+        ["Payment terms", "termination"],
+    ]
+    # payment terms: 1 + 1/2 + 1, termination: 1 + 1/2, liability: 1/2, warranty: 1/3
+    assert AIService._rank_topics(candidates, limit=10) == ["Payment Terms", "Termination", "Liability", "Warranty"]
+    assert AIService._rank_topics(candidates, limit=2) == ["Payment Terms", "Termination"]
+
+
+def test_rank_topics_keeps_first_appearance_on_ties():
+    assert AIService._rank_topics([["Beta", "Alpha"], ["Alpha", "Beta"]], limit=5) == ["Beta", "Alpha"]
+    assert AIService._rank_topics([[], ["", "  "]], limit=5) == []
+
+
+def test_single_summary_needs_no_reduce_call():
+    llm = RecordingLLM()
+    assert AIService(llm=llm)._reduce_summaries(["Only part."]) == "Only part."
+    assert llm.prompts == []
+
+
+def test_summaries_within_budget_are_reduced_in_one_call(monkeypatch):
+    monkeypatch.setattr(settings, "AI_COLLAPSE_MAX_TOKENS", 1000)
+    llm = RecordingLLM()
+    summaries = ["a" * 400, "b" * 400, "c" * 400]  # 100 tokens each
+
+    assert AIService(llm=llm)._reduce_summaries(summaries) == "merged"
+    assert llm.prompts == [REDUCE_PROMPT.format(summaries="\n\n".join(summaries))]
+
+
+def test_summaries_over_budget_collapse_in_groups(monkeypatch):
+    monkeypatch.setattr(settings, "AI_COLLAPSE_MAX_TOKENS", 250)
+    llm = RecordingLLM()
+    summaries = [str(i) * 400 for i in range(5)]  # 100 tokens each, two fit in one call
+
+    AIService(llm=llm)._reduce_summaries(summaries)
+
+    # Groups of two, two and one; then the three merged summaries in one call
+    assert [sum(summary in prompt for summary in summaries) for prompt in llm.prompts[:3]] == [2, 2, 1]
+    assert len(llm.prompts) == 4
+    assert llm.prompts[-1] == REDUCE_PROMPT.format(summaries="merged\n\nmerged\n\nmerged")
+
+
+def test_summaries_each_over_budget_are_merged_in_pairs(monkeypatch):
+    monkeypatch.setattr(settings, "AI_COLLAPSE_MAX_TOKENS", 50)
+    llm = RecordingLLM(reply="m" * 400)
+    summaries = ["x" * 400] * 4
+
+    AIService(llm=llm)._reduce_summaries(summaries)
+
+    # Pairs shrink the list every round: 4 -> 2 -> 1
+    assert len(llm.prompts) == 3
+
+
+def test_analysis_combines_map_results():
+    llm = FakeLLM(latency=0)
+    result = AIService(llm=llm).analyze_document(generate_text(3000, seed=2), strategy=STRATEGY_MAP_REDUCE)
+
+    topics = json.loads(result["key_topics"])
+    assert result["strategy"] == STRATEGY_MAP_REDUCE
+    assert 0 < len(topics) <= settings.AI_MAX_TOPICS
+    assert len(set(topic.lower() for topic in topics)) == len(topics)
+    assert llm.calls > 2
+
+
+def test_question_does_not_wait_behind_running_analyses(monkeypatch):
+    monkeypatch.setattr(settings, "AI_MAX_CONCURRENCY", 2)
+    service = AIService(llm=FakeLLM(latency=0.1))
+    long_text = generate_text(8000, seed=1)
+    analyses = [
+        threading.Thread(target=service.analyze_document, args=(long_text, STRATEGY_MAP_REDUCE))
+        for _ in range(3)
+    ]
+    for analysis in analyses:
+        analysis.start()
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    service.answer_question("When is payment due?", "Payment is due within sixty days.", compress=False)
+    elapsed = time.perf_counter() - started
+
+    for analysis in analyses:
+        analysis.join()
+    # One call's latency, not the dozens of map calls the analyses have in flight
+    assert elapsed < 0.3
+
+
+@pytest.mark.parametrize("tokens, strategy", [
+    (0, STRATEGY_STUFF),
+    (8000, STRATEGY_STUFF),
+    (8001, STRATEGY_MAP_REDUCE),
+    (100000, STRATEGY_MAP_REDUCE),
+    (100001, STRATEGY_HIERARCHICAL),
+])
+def test_plan_analysis_thresholds(monkeypatch, tokens, strategy):
+    monkeypatch.setattr(settings, "AI_STUFF_MAX_TOKENS", 8000)
+    monkeypatch.setattr(settings, "AI_MAP_REDUCE_MAX_TOKENS", 100000)
+    # estimate_tokens counts four characters per token
+    assert AIService(llm=RecordingLLM()).plan_analysis("x" * tokens * 4) == strategy
+
+
+def test_identical_chunks_are_mapped_once():
+    llm = RecordingLLM(reply='{"summary": "Part.", "topics": ["boilerplate"]}')
+    service = AIService(llm=llm)
+    section = generate_text(600, seed=3)
+    text = "\n\n".join([section, generate_text(600, seed=4), section, section])
+    chunks = service._split_text(text)
+    assert len(set(chunks)) < len(chunks)
+
+    service.analyze_document(text, strategy=STRATEGY_MAP_REDUCE)
+
+    map_prompts = [prompt for prompt in llm.prompts if '"topics"' in prompt]
+    assert len(map_prompts) == len(set(chunks))
@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.migrations import upgrade_schema
+from app.models.document import Document
+from app.services import embedder
+from app.services.answer_cache import AnswerCache
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    upgrade_schema(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def hashing_embedder(monkeypatch):
+    monkeypatch.setattr(embedder, "_embedder", embedder.HashingEmbedder)
+
+
+def cached_answer(db, cached_question: str, question: str):
+    document = Document(filename="contract.txt", file_path="contract.txt", file_type="txt", content="Contract text")
+    db.add(document)
+    db.flush()
+    cache = AnswerCache(db)
+    cache.store(document, cached_question, "cached answer")
+    return cache.lookup(document, question)
+
+
+@pytest.mark.usefixtures("hashing_embedder")
+def test_rephrasing_reuses_answer(db):
+    assert cached_answer(db, "Who are the parties to this agreement?", "who are the parties to the agreement") == "cached answer"
+
+
+@pytest.mark.usefixtures("hashing_embedder")
+@pytest.mark.parametrize("cached_question, question", [
+    ("Is the supplier liable for data loss?", "Is the supplier not liable for data loss?"),
+    ("Is the supplier not liable for data loss?", "Is the supplier liable for data loss?"),
+    ("What is the payment due in 2023?", "What is the payment due in 2024?"),
+    ("Is the fee 1,500 EUR?", "Is the fee 15,000 EUR?"),
+])
+def test_different_numbers_or_negation_miss(db, cached_question, question):
+    assert cached_answer(db, cached_question, question) is None
+
+
+def test_paraphrase_matches_with_sentence_model(db, monkeypatch):
+    pytest.importorskip("sentence_transformers")
+    monkeypatch.setattr(embedder, "_embedder", None)
+    answer = cached_answer(db, "What's the deadline for termination?", "By when must the contract be terminated?")
+    assert answer == "cached answer"
+
+
+@pytest.mark.usefixtures("hashing_embedder")
+def test_hashing_embedder_misses_paraphrases(db):
+    # Documented limitation of the default embedder: only near-identical wording is reused
+    assert cached_answer(db, "What's the deadline for termination?", "By when must the contract be terminated?") is None
+
+
+def test_sentence_model_uses_its_own_threshold(db, monkeypatch):
+    # Stand-in for the model: the two questions are 0.75 apart, between the model and hashing thresholds
+    vectors = {
+        "What's the deadline for termination?": [1.0, 0.0],
+        "By when must the contract be terminated?": [0.75, 0.6614],
+    }
+
+    class FakeSentenceTransformer:
+        def __init__(self, name):
+            self.name = name
+
+        def encode(self, text, normalize_embeddings):
+            return vectors[text]
+
+    monkeypatch.setattr(embedder, "SentenceTransformer", FakeSentenceTransformer)
+    monkeypatch.setattr(embedder, "_embedder", None)
+
+    answer = cached_answer(db, "What's the deadline for termination?", "By when must the contract be terminated?")
+    assert answer == "cached answer"
+    assert embedder.get_embedder().similarity_threshold() == embedder.settings.ANSWER_CACHE_MODEL_SIMILARITY
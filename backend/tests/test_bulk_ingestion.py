@@ -0,0 +1,128 @@
+import asyncio
+import io
+import os
+import zipfile
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.api.endpoints.documents import delete_document
+from app.core.config import settings
+from app.models.document import IngestionBatch, IngestionItem
+from app.services import analysis_runner, bulk_ingestion
+from app.services.bulk_ingestion import BulkIngestionService
+from benchmarks.fake_llm import FakeLLM
+
+TEXT = b"The supplier shall deliver the goods within thirty days.\n\nPayment is due within sixty days."
+
+
+def zip_upload(entries: dict, filename: str = "documents.zip") -> UploadFile:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return UploadFile(file=buffer, filename=filename)
+
+
+def receive(db, *uploads) -> IngestionBatch:
+    return asyncio.run(BulkIngestionService.receive_files(list(uploads), db))
+
+
+def statuses(db, batch_id: int) -> dict:
+    db.expire_all()
+    return {
+        item.filename: (item.status, item.error)
+        for item in db.query(IngestionItem).filter(IngestionItem.batch_id == batch_id)
+    }
+
+
+@pytest.fixture(autouse=True)
+def fake_llm(monkeypatch):
+    monkeypatch.setattr(analysis_runner.ai_service, "llm", FakeLLM(latency=0))
+
+
+def test_zip_over_limit_is_rejected_before_extracting(db, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_BULK_FILES", 2)
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    before = set(os.listdir(settings.UPLOAD_DIR))
+    upload = zip_upload({"a.txt": TEXT, "b.txt": TEXT, "c.txt": TEXT, "__MACOSX/._a.txt": b"", "dir/": b""})
+
+    with pytest.raises(HTTPException) as error:
+        receive(db, UploadFile(file=io.BytesIO(TEXT), filename="loose.txt"), upload)
+
+    assert error.value.status_code == 413
+    assert set(os.listdir(settings.UPLOAD_DIR)) == before
+
+
+def test_bad_entries_are_recorded_as_failed_items(db, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", 1000)
+    upload = zip_upload({"ok.txt": TEXT, "big.txt": b"x" * 2000, "image.png": b"png"})
+    bad_archive = UploadFile(file=io.BytesIO(b"not a zip"), filename="broken.zip")
+
+    batch = receive(db, upload, bad_archive)
+
+    assert batch.total_files == 4
+    assert statuses(db, batch.id) == {
+        "ok.txt": ("pending", None),
+        "big.txt": ("failed", "File too large"),
+        "image.png": ("failed", "Unsupported file type: png"),
+        "broken.zip": ("failed", "Invalid ZIP archive"),
+    }
+
+
+def test_unreadable_file_fails_alone(db, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_EXTRACT_WORKERS", 1)
+    batch = receive(db, zip_upload({"ok.txt": TEXT, "corrupt.pdf": b"not a pdf"}))
+
+    BulkIngestionService.process_batch(batch.id)
+
+    items = statuses(db, batch.id)
+    assert items["ok.txt"] == ("completed", None)
+    assert items["corrupt.pdf"][0] == "failed"
+    assert db.get(IngestionBatch, batch.id).status == "completed"
+
+
+def test_crashed_extraction_fails_the_batch(db, monkeypatch):
+    def broken_pool(file_paths, **kwargs):
+        yield TEXT.decode(), None
+        raise BrokenProcessPool("worker died")
+
+    monkeypatch.setattr(bulk_ingestion.DocumentProcessor, "extract_many", broken_pool)
+    batch = receive(db, zip_upload({"a.txt": TEXT, "b.txt": TEXT}))
+
+    BulkIngestionService.process_batch(batch.id)
+
+    assert statuses(db, batch.id) == {
+        "a.txt": ("failed", "Ingestion failed: worker died"),
+        "b.txt": ("failed", "Ingestion failed: worker died"),
+    }
+    assert db.get(IngestionBatch, batch.id).status == "failed"
+
+
+def test_analysis_error_fails_unfinished_items(db, monkeypatch):
+    def analyze(item_id, document_id, analysis_id):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(settings, "BULK_EXTRACT_WORKERS", 1)
+    monkeypatch.setattr(bulk_ingestion, "_analyze_item", analyze)
+    batch = receive(db, zip_upload({"a.txt": TEXT}))
+
+    BulkIngestionService.process_batch(batch.id)
+
+    assert statuses(db, batch.id) == {"a.txt": ("failed", "Analysis failed: database went away")}
+    assert db.get(IngestionBatch, batch.id).status == "failed"
+
+
+def test_deleting_a_bulk_uploaded_document_keeps_its_item(db, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_EXTRACT_WORKERS", 1)
+    batch = receive(db, zip_upload({"a.txt": TEXT}))
+    BulkIngestionService.process_batch(batch.id)
+    item = db.query(IngestionItem).filter(IngestionItem.batch_id == batch.id).one()
+
+    delete_document(item.document_id, db)
+
+    db.expire_all()
+    assert item.document_id is None
+    assert item.status == "completed"
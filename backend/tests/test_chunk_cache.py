@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.models.document import ChunkSummary
+from app.schemas.analysis import ChunkAnalysis
+from app.services.chunk_cache import ChunkSummaryCache
+
+
+def result(name: str) -> ChunkAnalysis:
+    return ChunkAnalysis(summary=f"Summary of {name}", topics=[name])
+
+
+def test_round_trip(db):
+    cache = ChunkSummaryCache(db)
+    cache.put_many({"a": result("a")})
+    db.commit()
+
+    assert cache.get_many(["a", "b"]) == {"a": result("a")}
+    assert cache.hits == 1
+
+
+def test_least_recently_used_entries_are_evicted(db, monkeypatch):
+    monkeypatch.setattr(settings, "CHUNK_SUMMARY_CACHE_MAX_ENTRIES", 2)
+    cache = ChunkSummaryCache(db)
+    cache.put_many({"a": result("a"), "b": result("b")})
+    db.query(ChunkSummary).update({"last_used_at": datetime.utcnow() - timedelta(hours=1)})
+    db.commit()
+
+    # Reading "a" makes "b" the least recently used entry
+    cache.get_many(["a"])
+    cache.put_many({"c": result("c")})
+    db.commit()
+
+    assert sorted(row[0] for row in db.query(ChunkSummary.prompt_hash)) == ["a", "c"]
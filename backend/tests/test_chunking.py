@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from app.services.chunking import split_stream, split_text
+
+SENTENCE = "The supplier shall deliver the goods within thirty days of the order date. "
+
+
+def pieces(text: str, size: int):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+def random_text(seed: int) -> str:
+    rng = random.Random(seed)
+    separators = [" ", " ", " ", "\n", "\n\n", " \n  \n", "  \n", "\n\t"]
+    words = (SENTENCE * 40).split(" ")
+    return "\n " + "".join(word + (rng.choice(separators) if rng.random() < 0.3 else " ") for word in words) + "\n\n "
+
+
+TEXTS = {
+    "paragraphs": "\n\n".join(SENTENCE * (i % 7 + 1) for i in range(60)),
+    "single_newlines": "\n".join(SENTENCE * (i % 3 + 1) for i in range(300)),
+    "one_long_line": SENTENCE * 200,
+    "mixed_whitespace": random_text(0),
+    "mixed_whitespace_2": random_text(1),
+}
+
+
+@pytest.mark.parametrize("name", TEXTS)
+@pytest.mark.parametrize("piece_size", [1, 13, 4096])
+@pytest.mark.parametrize("chunk_size", [100, 1000])
+def test_split_stream_matches_split_text(name, piece_size, chunk_size):
+    text = TEXTS[name]
+    assert list(split_stream(pieces(text, piece_size), chunk_size)) == split_text(text, chunk_size)
+
+
+def test_split_stream_without_blank_lines_does_not_buffer_the_text():
+    text = TEXTS["single_newlines"] * 20
+    consumed = []
+
+    def tracked(source):
+        for piece in source:
+            consumed.append(len(piece))
+            yield piece
+
+    chunks = split_stream(tracked(pieces(text, 256)), 1000)
+    next(chunks)
+    assert sum(consumed) < 1000 + 2 * 256
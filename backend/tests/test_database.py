@@ -0,0 +1,21 @@
+from sqlalchemy import event, text
+
+from app.db.database import engine, get_db
+
+
+def test_get_db_connects_only_when_a_query_runs():
+    checkouts = []
+
+    def count(*args):
+        checkouts.append(args)
+
+    event.listen(engine, "checkout", count)
+    try:
+        session = get_db()
+        db = next(session)
+        assert checkouts == []
+        db.execute(text("SELECT 1"))
+        assert len(checkouts) == 1
+        session.close()
+    finally:
+        event.remove(engine, "checkout", count)
@@ -0,0 +1,93 @@
+import codecs
+
+import pytest
+
+from app.services import document_processor
+from app.services.document_processor import DocumentProcessor, detect_text_encoding
+
+ENGLISH = "The supplier’s fee is 1.500 € per month – payable “in advance”; café and naïve clauses apply.\n" * 20
+RUSSIAN = "Поставщик обязуется поставить товар в течение тридцати дней с даты заказа.\n" * 20
+
+
+def write(tmp_path, data: bytes):
+    path = tmp_path / "document.txt"
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("data, encoding", [
+    (ENGLISH.encode("utf-8"), "utf-8"),
+    (codecs.BOM_UTF8 + ENGLISH.encode("utf-8"), "utf-8-sig"),
+    (codecs.BOM_UTF16_LE + ENGLISH.encode("utf-16-le"), "utf-16"),
+    (codecs.BOM_UTF16_BE + ENGLISH.encode("utf-16-be"), "utf-16"),
+    (ENGLISH.encode("cp1252"), "cp1252"),
+])
+def test_detects_encoding(tmp_path, data, encoding):
+    path = write(tmp_path, data)
+    assert codecs.lookup(detect_text_encoding(path)).name == codecs.lookup(encoding).name
+    assert DocumentProcessor.extract_text(path) == ENGLISH
+
+
+def test_detects_cyrillic_code_page(tmp_path):
+    pytest.importorskip("charset_normalizer")
+    path = write(tmp_path, RUSSIAN.encode("cp1251"))
+    assert DocumentProcessor.extract_text(path) == RUSSIAN
+
+
+def test_undecodable_bytes_fall_back_to_latin1(tmp_path, monkeypatch):
+    # Without charset_normalizer's guess, bytes that are neither UTF-8 nor cp1252 (0x81 is
+    # undefined there) are still read
+    monkeypatch.setattr(document_processor, "from_bytes", None)
+    path = write(tmp_path, b"caf\xe9 \x81 fee")
+    assert DocumentProcessor.extract_text(path) == "caf\xe9 \x81 fee"
+
+
+def test_multibyte_characters_across_read_blocks(tmp_path):
+    # Long enough that characters straddle the boundaries of the blocks read from disk
+    text = "Überweisung €" * 20000
+    path = write(tmp_path, text.encode("utf-8"))
+    assert DocumentProcessor.extract_text(path) == text
+
+
+WORD_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"><w:body>{}</w:body></w:document>'
+)
+
+
+def write_docx(tmp_path, document_xml: str):
+    import zipfile
+
+    path = tmp_path / "document.docx"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", document_xml)
+    return str(path)
+
+
+def test_docx_external_entities_are_not_resolved(tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("TOP SECRET")
+    document_xml = (
+        f'<?xml version="1.0"?><!DOCTYPE w:document [<!ENTITY xxe SYSTEM "file://{secret}">]>'
+        + WORD_XML.format("<w:p><w:r><w:t>Before &xxe; after</w:t></w:r></w:p>")
+    )
+
+    text = "".join(DocumentProcessor._iter_docx(write_docx(tmp_path, document_xml)))
+
+    assert "TOP SECRET" not in text
+    assert text.startswith("Before")
+
+
+def test_docx_text_box_fallback_is_read_once(tmp_path):
+    text_box = "<w:p><w:r><w:t>Text box</w:t></w:r></w:p>"
+    document_xml = WORD_XML.format(
+        "<w:p><w:r><w:t>Body</w:t></w:r><w:r><mc:AlternateContent>"
+        f"<mc:Choice Requires=\"wps\"><w:txbxContent>{text_box}</w:txbxContent></mc:Choice>"
+        f"<mc:Fallback><w:txbxContent>{text_box}</w:txbxContent></mc:Fallback>"
+        "</mc:AlternateContent></w:r></w:p>"
+        "<w:p><w:r><w:t>Last</w:t></w:r></w:p>"
+    )
+
+    text = "".join(DocumentProcessor._iter_docx(write_docx(tmp_path, document_xml)))
+
+    assert text == "Text box\n\nBody\n\nLast"
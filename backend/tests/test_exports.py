@@ -0,0 +1,85 @@
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import exports
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.document import Analysis, Conversation, Document, Message
+from app.models.user import User
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    # Small batches so an export spans several cursor partitions
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    db.add(User(username="auditor", hashed_password="not used"))
+    for day in range(1, 6):
+        document = Document(filename=f"doc{day}.txt", file_path=f"doc{day}.txt", file_type="txt",
+                            content=f"Text {day}", tags='["legal"]', upload_date=datetime(2024, 1, day))
+        db.add(document)
+        db.flush()
+        db.add(Analysis(document_id=document.id, summary=f"Summary {day}", key_topics='["topic"]',
+                        created_at=datetime(2024, 1, day)))
+        conversation = Conversation(document_id=document.id, created_at=datetime(2024, 1, day))
+        conversation.messages = [Message(content="Question?", is_user=1), Message(content="Answer.", is_user=0)]
+        db.add(conversation)
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(exports.router, prefix="/api/exports")
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {create_access_token({'sub': 'auditor'})}"
+    return client
+
+
+def rows(response) -> list:
+    assert response.status_code == 200
+    assert response.content.endswith(b"\n")
+    return [json.loads(line) for line in response.content.decode("utf-8").splitlines()]
+
+
+def test_documents_are_one_json_object_per_line(client):
+    documents = rows(client.get("/api/exports/documents"))
+
+    assert [document["id"] for document in documents] == [1, 2, 3, 4, 5]
+    assert documents[0] == {
+        "id": 1, "filename": "doc1.txt", "file_type": "txt", "upload_date": "2024-01-01T00:00:00",
+        "tags": ["legal"], "content": "Text 1",
+    }
+    without_content = rows(client.get("/api/exports/documents", params={"include_content": False}))
+    assert "content" not in without_content[0]
+
+
+def test_compressed_export_is_gzip(client):
+    response = client.get("/api/exports/analyses", params={"compress": True})
+
+    assert response.headers["content-type"] == "application/gzip"
+    assert "analyses.jsonl.gz" in response.headers["content-disposition"]
+    plain = client.get("/api/exports/analyses").content
+    assert gzip.decompress(response.content) == plain
+
+
+def test_after_id_resumes_after_the_last_row(client):
+    first = rows(client.get("/api/exports/conversations"))
+    resumed = rows(client.get("/api/exports/conversations", params={"after_id": first[2]["id"]}))
+
+    assert [row["id"] for row in resumed] == [row["id"] for row in first[3:]]
+    assert [message["role"] for message in resumed[0]["messages"]] == ["user", "assistant"]
+
+
+def test_since_is_inclusive_and_until_exclusive(client):
+    documents = rows(client.get("/api/exports/documents", params={"since": "2024-01-02", "until": "2024-01-04"}))
+
+    assert [document["upload_date"][:10] for document in documents] == ["2024-01-02", "2024-01-03"]
+
+
+def test_exports_require_a_token(client):
+    del client.headers["Authorization"]
+
+    for name in ("documents", "analyses", "conversations"):
+        assert client.get(f"/api/exports/{name}").status_code == 401
@@ -0,0 +1,112 @@
+from app.models.document import CorpusTerm, Document
+from app.services.keyphrase_extractor import KeyphraseExtractor
+
+TEXT = (
+    "Solar panel efficiency depends on temperature. Solar panel installers measure "
+    "efficiency in the field, and the report compares solar panel models."
+)
+
+
+def add_document(db, content: str, terms_indexed: bool = False) -> Document:
+    document = Document(filename="doc.txt", file_path=f"doc-{content}.txt", file_type="txt",
+                        content=content, terms_indexed=terms_indexed)
+    db.add(document)
+    db.flush()
+    return document
+
+
+def counts(db) -> dict:
+    return dict(db.query(CorpusTerm.term, CorpusTerm.document_count).all())
+
+
+def test_document_terms_skip_stopwords_and_short_words():
+    assert KeyphraseExtractor.document_terms("The cat and an Ox sat; the CAT ran") == {"cat", "sat", "ran"}
+
+
+def test_extract_returns_distinct_phrases_without_stopwords():
+    topics = KeyphraseExtractor.extract(TEXT, {}, 0, limit=3)
+
+    assert len(topics) == 3
+    for topic in topics:
+        words = set(topic.lower().split())
+        assert not words & {"the", "on", "in", "and"}
+        # A phrase covered by a better-ranked one is not repeated
+        assert not any(words < set(other.lower().split()) for other in topics)
+
+
+def test_extract_demotes_terms_common_in_the_corpus():
+    text = "Quarterly revenue grew. Customer churn fell. Quarterly revenue and customer churn were reported."
+    rare = KeyphraseExtractor.extract(text, {}, 100, limit=1)
+    common_revenue = KeyphraseExtractor.extract(text, {"quarterly": 100, "revenue": 100}, 100, limit=1)
+
+    assert rare == ["Quarterly revenue grew"]
+    assert common_revenue == ["Customer churn fell"]
+
+
+def test_update_frequencies_adds_and_drops_terms(db):
+    KeyphraseExtractor.update_frequencies(db, {"solar": 2, "panel": 1})
+    KeyphraseExtractor.update_frequencies(db, {"solar": 1, "panel": -1})
+    db.commit()
+
+    # A term no document contains any more is removed
+    assert counts(db) == {"solar": 3}
+
+
+def test_index_and_remove_document(db):
+    first = add_document(db, "Solar panels convert sunlight.")
+    second = add_document(db, "Wind turbines convert wind.")
+
+    KeyphraseExtractor.index_document(db, first, limit=5)
+    KeyphraseExtractor.index_document(db, second, limit=5)
+    assert counts(db)["convert"] == 2
+    assert first.terms_indexed and second.terms_indexed
+
+    KeyphraseExtractor.remove_document(db, first)
+    # Removing twice must not take the counts out again
+    KeyphraseExtractor.remove_document(db, first)
+    db.commit()
+
+    assert counts(db) == {"convert": 1, "wind": 1, "turbines": 1}
+    assert not first.terms_indexed
+
+
+def test_uncounted_documents_do_not_touch_the_corpus(db):
+    indexed = add_document(db, "Solar panels convert sunlight.")
+    KeyphraseExtractor.index_document(db, indexed, limit=5)
+    # A document stored before corpus terms existed contributed nothing
+    legacy = add_document(db, "Solar panels are cheap.")
+
+    KeyphraseExtractor.remove_document(db, legacy)
+    db.commit()
+
+    assert counts(db)["solar"] == 1
+
+
+def test_idf_only_counts_indexed_documents(db, monkeypatch):
+    for i in range(5):
+        add_document(db, f"Legacy document number {i}.")
+    document = add_document(db, "Solar panels convert sunlight.")
+    totals = []
+    original = KeyphraseExtractor.extract
+
+    def recording_extract(text, frequencies, total_documents, limit):
+        totals.append(total_documents)
+        return original(text, frequencies, total_documents, limit)
+
+    monkeypatch.setattr(KeyphraseExtractor, "extract", staticmethod(recording_extract))
+    KeyphraseExtractor.index_document(db, document, limit=5)
+
+    assert totals == [1]
+
+
+def test_backfill_counts_only_missing_documents(db):
+    indexed = add_document(db, "Solar panels convert sunlight.")
+    KeyphraseExtractor.index_document(db, indexed, limit=5)
+    legacy = [add_document(db, "Solar farms."), add_document(db, "Solar roofs.")]
+
+    added = KeyphraseExtractor.backfill(db, [indexed] + legacy)
+    db.commit()
+
+    assert added == 2
+    assert counts(db)["solar"] == 3
+    assert KeyphraseExtractor.backfill(db, [indexed] + legacy) == 0
@@ -0,0 +1,29 @@
+from sqlalchemy import create_engine, inspect
+
+from app.db.migrations import ADDED_COLUMNS, upgrade_schema
+
+
+def test_upgrade_adds_missing_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    upgrade_schema(engine)
+    # Recreate the schema as it was before these columns were introduced
+    with engine.begin() as connection:
+        for table_name, column_name in ADDED_COLUMNS:
+            connection.exec_driver_sql(f"ALTER TABLE {table_name} DROP COLUMN {column_name}")
+        connection.exec_driver_sql("INSERT INTO conversations (id) VALUES (1)")
+        connection.exec_driver_sql("INSERT INTO messages (conversation_id, content, is_user) VALUES (1, 'hi', 0)")
+
+    upgrade_schema(engine)
+
+    inspector = inspect(engine)
+    for table_name, column_name in ADDED_COLUMNS:
+        assert column_name in {column["name"] for column in inspector.get_columns(table_name)}
+    with engine.connect() as connection:
+        # Existing rows get the model default rather than NULL
+        assert connection.exec_driver_sql("SELECT from_cache FROM messages").scalar() == 0
+
+
+def test_upgrade_is_idempotent(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    upgrade_schema(engine)
+    upgrade_schema(engine)
@@ -0,0 +1,70 @@
+import pytest
+from google.ai.generativelanguage_v1beta.types import Candidate, Content, GenerateContentResponse, Part
+from google.api_core.exceptions import DeadlineExceeded
+from langchain_core.messages import AIMessage
+
+from app.core.config import settings
+from app.services.model_router import ModelRouter
+
+
+class DeadlineModel:
+    """Stands in for a chat model whose request runs past the timeout it is given"""
+
+    def __init__(self, name: str, slow: bool):
+        self.name = name
+        self.slow = slow
+        self.timeouts = []
+
+    def invoke(self, prompt, config=None, timeout=None):
+        self.timeouts.append(timeout)
+        if self.slow:
+            raise DeadlineExceeded("Deadline Exceeded")
+        return AIMessage(content=self.name)
+
+
+@pytest.fixture
+def models():
+    return {"primary": DeadlineModel("primary", slow=True), "fallback": DeadlineModel("fallback", slow=False)}
+
+
+@pytest.fixture
+def router(monkeypatch, models):
+    monkeypatch.setattr(settings, "AI_STAGE_MODELS", {"map": "primary"})
+    monkeypatch.setattr(settings, "AI_FALLBACK_MODEL", "fallback")
+    monkeypatch.setattr(settings, "AI_STAGE_TIMEOUTS", {"map": 0.2})
+    router = ModelRouter()
+    monkeypatch.setattr(router, "_model", lambda name: models[name])
+    return router
+
+
+def test_slow_model_falls_back_at_deadline(router, models):
+    assert router.invoke("map", "Summarize").content == "fallback"
+    assert models["primary"].timeouts == [0.2]
+    assert models["fallback"].timeouts == [0.2]
+
+
+def test_slow_model_without_fallback_times_out(router, monkeypatch):
+    monkeypatch.setattr(settings, "AI_FALLBACK_MODEL", "primary")
+    with pytest.raises(DeadlineExceeded):
+        router.invoke("map", "Summarize")
+
+
+def test_timeout_reaches_the_api_request(monkeypatch):
+    monkeypatch.setattr(settings, "AI_STAGE_TIMEOUTS", {"qa": 7})
+    router = ModelRouter()
+    model = router._model(router.model_name("qa"))
+    requests = []
+
+    class Client:
+        @staticmethod
+        def generate_content(**kwargs):
+            requests.append(kwargs)
+            return GenerateContentResponse(candidates=[
+                Candidate(content=Content(parts=[Part(text="answer")]), finish_reason=1)
+            ])
+
+    # The real client is replaced at the transport boundary, everything above it runs as in production
+    object.__setattr__(model, "client", Client())
+
+    assert router.invoke("qa", "Question?").content == "answer"
+    assert requests[0]["timeout"] == 7
@@ -0,0 +1,104 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.migrations import upgrade_schema
+from app.models.document import Document, DocumentLshBucket
+from app.services.near_duplicate import MinHasher, NearDuplicateIndex
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+
+def random_words(rng: random.Random, count: int) -> list:
+    return [rng.choice(VOCABULARY) for _ in range(count)]
+
+
+def revise(rng: random.Random, words: list, fraction: float) -> list:
+    """Replace a fraction of the words, in a few contiguous edits as a real revision would"""
+    revised = list(words)
+    for _ in range(5):
+        start = rng.randrange(len(words))
+        for i in range(start, min(len(words), start + int(len(words) * fraction / 5))):
+            revised[i] = rng.choice(VOCABULARY)
+    return revised
+
+
+def jaccard(a: str, b: str) -> float:
+    a, b = set(MinHasher.shingle_hashes(a)), set(MinHasher.shingle_hashes(b))
+    return len(a & b) / len(a | b)
+
+
+def is_candidate(a: str, b: str) -> bool:
+    return bool(set(MinHasher.band_buckets(MinHasher.signature(a))) & set(MinHasher.band_buckets(MinHasher.signature(b))))
+
+
+def test_lsh_recall_for_similar_documents():
+    rng = random.Random(7)
+    pairs = []
+    while len(pairs) < 100:
+        words = random_words(rng, 1000)
+        original, revision = " ".join(words), " ".join(revise(rng, words, 0.05))
+        if jaccard(original, revision) >= 0.6:
+            pairs.append((original, revision))
+
+    recall = sum(is_candidate(original, revision) for original, revision in pairs) / len(pairs)
+    # Expected about 0.99 at a Jaccard similarity of 0.6
+    assert recall >= 0.95
+
+
+def test_lsh_rarely_pairs_unrelated_documents():
+    rng = random.Random(8)
+    documents = [" ".join(random_words(rng, 1000)) for _ in range(40)]
+    false_candidates = sum(
+        is_candidate(documents[i], documents[j]) for i in range(len(documents)) for j in range(i + 1, len(documents))
+    )
+    assert false_candidates == 0
+
+
+def test_signature_similarity_estimates_jaccard():
+    rng = random.Random(9)
+    words = random_words(rng, 2000)
+    original, revision = " ".join(words), " ".join(revise(rng, words, 0.1))
+    estimate = MinHasher.similarity(MinHasher.signature(original), MinHasher.signature(revision))
+    assert estimate == pytest.approx(jaccard(original, revision), abs=0.12)
+
+
+def test_find_near_duplicates_returns_revision(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'lsh.db'}")
+    upgrade_schema(engine)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(10)
+    words = random_words(rng, 1000)
+    texts = {"original": words, "revision": revise(rng, words, 0.05), "unrelated": random_words(rng, 1000)}
+    documents = {}
+    for name, text_words in texts.items():
+        documents[name] = Document(filename=f"{name}.txt", file_path=f"{name}.txt", file_type="txt", content=" ".join(text_words))
+        db.add(documents[name])
+        db.flush()
+        NearDuplicateIndex.index_document(db, documents[name])
+    db.commit()
+
+    matches = NearDuplicateIndex.find_near_duplicates(db, documents["revision"], threshold=0.5)
+    assert [document.filename for document, _ in matches] == ["original.txt"]
+    db.close()
+
+
+def test_documents_without_words_are_not_indexed(db):
+    assert MinHasher.signature("  \n ... ") is None
+
+    documents = [
+        Document(filename=f"scan{i}.pdf", file_path=f"scan{i}.pdf", file_type="pdf", content="")
+        for i in range(3)
+    ]
+    db.add_all(documents)
+    db.flush()
+    for document in documents:
+        NearDuplicateIndex.index_document(db, document)
+    db.commit()
+
+    # Empty extractions (e.g. scanned PDFs) must not all match each other
+    assert db.query(DocumentLshBucket).count() == 0
+    assert all(document.minhash is None for document in documents)
+    assert NearDuplicateIndex.find_near_duplicates(db, documents[0], threshold=0.5) == []
@@ -0,0 +1,107 @@
+import json
+from argparse import Namespace
+
+import pytest
+
+import reprocess
+from app.models.document import CorpusTerm, Document, ReprocessRun
+from app.services.keyphrase_extractor import KeyphraseExtractor
+from app.services.rate_limiter import RateLimiter
+
+ARGS = Namespace(batch_size=2, workers=1, llm_concurrency=2, llm_rate=0)
+
+
+def add_documents(db, count: int) -> list:
+    documents = [
+        Document(filename=f"doc{i}.txt", file_path=f"doc{i}.txt", file_type="txt", content=f"Document {i} text")
+        for i in range(count)
+    ]
+    db.add_all(documents)
+    db.commit()
+    return [document.id for document in documents]
+
+
+def new_run(db) -> ReprocessRun:
+    run = ReprocessRun(stages="analyze", filters="{}", status="running")
+    db.add(run)
+    db.commit()
+    return run
+
+
+def test_deleted_document_is_counted_as_failed(db, monkeypatch):
+    ids = add_documents(db, 3)
+    analyzed = []
+    monkeypatch.setattr(reprocess, "run_analysis", lambda text, analysis_id, session: analyzed.append(text) or True)
+
+    class DeletingLimiter(RateLimiter):
+        # Deletes a document of the first batch after the batch was loaded
+        def acquire(self):
+            session = reprocess.SessionLocal()
+            session.query(Document).filter(Document.id == ids[1]).delete()
+            session.commit()
+            session.close()
+
+    monkeypatch.setattr(reprocess, "RateLimiter", DeletingLimiter)
+    run = new_run(db)
+
+    reprocess.reprocess(db, run, ARGS)
+
+    assert (run.status, run.processed, run.failed) == ("completed", 3, 1)
+    assert len(analyzed) == 2
+
+
+def test_error_marks_the_run_failed(db, monkeypatch):
+    add_documents(db, 3)
+    monkeypatch.setattr(reprocess, "run_analysis", lambda *args: True)
+    run = new_run(db)
+    calls = []
+    original = reprocess.filtered_documents
+
+    def failing_second_batch(session, filters):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("database went away")
+        return original(session, filters)
+
+    monkeypatch.setattr(reprocess, "filtered_documents", failing_second_batch)
+
+    with pytest.raises(RuntimeError):
+        reprocess.reprocess(db, run, ARGS)
+
+    db.expire_all()
+    # The first batch's checkpoint is kept so the run can be resumed
+    assert (run.status, run.processed) == ("failed", 2)
+
+
+def test_terms_stage_counts_documents_missing_from_the_corpus(db):
+    ids = add_documents(db, 3)
+    run = ReprocessRun(stages="terms", filters="{}", status="running")
+    db.add(run)
+    db.commit()
+
+    reprocess.reprocess(db, run, ARGS)
+
+    db.expire_all()
+    assert run.status == "completed"
+    assert db.query(Document).filter(Document.terms_indexed.is_(True)).count() == len(ids)
+    assert db.query(CorpusTerm.document_count).filter(CorpusTerm.term == "document").scalar() == 3
+
+
+def test_extract_keeps_counts_of_other_documents(db, monkeypatch):
+    ids = add_documents(db, 2)
+    counted = db.query(Document).filter(Document.id == ids[0]).one()
+    KeyphraseExtractor.index_document(db, counted, limit=5)
+    db.commit()
+    # The second document predates corpus terms and contributed nothing to the counts
+    monkeypatch.setattr(reprocess.DocumentProcessor, "extraction_pool", lambda workers: None)
+    monkeypatch.setattr(reprocess.DocumentProcessor, "extract_many",
+                        lambda paths, executor=None: [("Fresh text", None) for _ in paths])
+    run = ReprocessRun(stages="extract", filters=json.dumps({"ids": [ids[1]]}), status="running")
+    db.add(run)
+    db.commit()
+
+    reprocess.reprocess(db, run, ARGS)
+
+    counts = dict(db.query(CorpusTerm.term, CorpusTerm.document_count).all())
+    assert counts["document"] == 1
+    assert counts["fresh"] == 1
@@ -0,0 +1,27 @@
+from app.services.text_compressor import TextCompressor
+
+PARAGRAPHS = [
+    "This agreement is made between Acme Corp and Globex Ltd. It starts on 1 March 2024.",
+    "The supplier shall deliver the goods within thirty days.  Late delivery incurs a penalty of two percent per week.",
+    "Payment is due within sixty days of the invoice date. Invoices are sent monthly.",
+    "Either party may terminate the agreement with ninety days written notice.",
+]
+TEXT = "\n\n".join(PARAGRAPHS)
+
+
+def test_source_offset_maps_kept_sentences_back():
+    compressed = TextCompressor.compress(TEXT, ratio=0.6)
+    assert 0 < len(compressed.spans) < 7
+    position = 0
+    for start, end in compressed.spans:
+        for offset in range(end - start):
+            assert compressed.source_offset(position + offset) == start + offset
+        assert compressed.text[position:position + end - start] == TEXT[start:end]
+        # Kept sentences are joined by one separator character
+        position += end - start + 1
+    assert compressed.source_offset(len(compressed.text) + 10) == len(TEXT)
+
+
+def test_duplicate_paragraphs_are_dropped():
+    compressed = TextCompressor.compress(TEXT + "\n\n" + PARAGRAPHS[2], ratio=1.0)
+    assert compressed.duplicates_removed == 1
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import security
+from app.core.security import TokenCache
+from app.db.migrations import upgrade_schema
+from app.models.user import User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(security.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    # Deactivation and deletion events invalidate the module's cache
+    cache = TokenCache(ttl=60, max_entries=3)
+    monkeypatch.setattr(security, "token_cache", cache)
+    return cache
+
+
+def far_future() -> float:
+    return time.time() + 3600
+
+
+def test_entry_expires_after_ttl(cache, clock):
+    user = User(id=1, username="alice", is_active=True)
+    cache.put("token", user, far_future())
+    clock.now += 59
+    assert cache.get("token") is user
+    clock.now += 2
+    assert cache.get("token") is None
+
+
+def test_entry_never_outlives_the_token(cache, clock):
+    cache.put("token", User(id=1, username="alice", is_active=True), time.time() + 5)
+    clock.now += 6
+    assert cache.get("token") is None
+
+
+def test_zero_ttl_disables_the_cache(cache):
+    cache.ttl = 0
+    cache.put("token", User(id=1, username="alice", is_active=True), far_future())
+    assert cache.get("token") is None
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    users = {name: User(id=i, username=name, is_active=True) for i, name in enumerate("abcd")}
+    for name in "abc":
+        cache.put(name, users[name], far_future())
+    cache.get("a")
+    cache.put("d", users["d"], far_future())
+    assert cache.get("b") is None
+    assert [cache.get(name) for name in "acd"] == [users["a"], users["c"], users["d"]]
+
+
+def test_deactivation_drops_the_users_tokens(cache):
+    alice = User(id=1, username="alice", is_active=True)
+    bob = User(id=2, username="bob", is_active=True)
+    cache.put("alice-1", alice, far_future())
+    cache.put("alice-2", alice, far_future())
+    cache.put("bob", bob, far_future())
+
+    alice.is_active = False
+
+    assert cache.get("alice-1") is None
+    assert cache.get("alice-2") is None
+    assert cache.get("bob") is bob
+
+
+def test_deletion_drops_the_users_tokens(cache, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    upgrade_schema(engine)
+    db = sessionmaker(bind=engine)()
+    user = User(username="alice", hashed_password="x", is_active=True)
+    db.add(user)
+    db.commit()
+    cache.put("token", user, far_future())
+
+    db.delete(user)
+    db.commit()
+
+    assert cache.get("token") is None
+    db.close()
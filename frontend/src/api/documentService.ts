@@ -19,6 +19,7 @@ export interface Analysis {
   document_id: number;
   summary: string;
   key_topics: string;
+  strategy?: string | null;
   created_at: string;
 }
 
@@ -26,6 +27,7 @@ export interface Message {
   id: number;
   content: string;
   is_user: number; // 1 for user, 0 for AI
+  from_cache?: boolean; // AI answer reused from an earlier, similar question
   created_at: string;
 }
 